@@ -0,0 +1,297 @@
+import argparse
+import importlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+from runner import DAYS
+
+DEFAULT_SOCKET = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "adventofcode_2024.sock"
+)
+
+# Parsed inputs each worker keeps, most recently used last. Set by the
+# initializer from --parsed-inputs.
+_parsed: "OrderedDict[tuple[int, str, int, int], Any]" = OrderedDict()
+_parsed_limit = 32
+
+
+def _warm_up(parsed_limit: int) -> None:
+    """
+    Worker initializer: import every day once so requests never pay for it.
+    Days whose imports fail are reported when they are requested.
+    """
+    global _parsed_limit
+    _parsed_limit = parsed_limit
+    for spec in DAYS.values():
+        try:
+            importlib.import_module(spec.module)
+        except Exception:
+            pass
+
+
+def _parse(day: int, file_path: str) -> tuple[Any, bool]:
+    """
+    Return the day's parse of file_path and whether it was already resident.
+    Entries are keyed by the file's mtime and size, so a changed input is
+    parsed again.
+    """
+    stat = os.stat(file_path)
+    key = (day, os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    if key in _parsed:
+        _parsed.move_to_end(key)
+        return _parsed[key], True
+
+    spec = DAYS[day]
+    data = getattr(importlib.import_module(spec.module), spec.parser)(file_path)
+    _parsed[key] = data
+    while len(_parsed) > _parsed_limit:
+        _parsed.popitem(last=False)
+    return data, False
+
+
+def solve(
+    day: int, part: str, file_path: str, options: Optional[dict[str, int]] = None
+) -> dict[str, Any]:
+    """
+    Solve one part of a day in this worker, reusing its imports, parsed
+    inputs and the days' own memo tables from earlier requests.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    response: dict[str, Any] = {"day": day, "part": part, "pid": os.getpid()}
+    try:
+        spec = DAYS[day]
+        if part not in spec.parts:
+            raise ValueError(f"day {day} has no {part}; it has {', '.join(spec.parts)}")
+        data, response["parse_cached"] = _parse(day, file_path)
+        module = importlib.import_module(spec.module)
+        answer = getattr(module, part)(data, **(options or {}))
+        response["answer"] = None if answer is None else str(answer)
+    except Exception as e:
+        response["error"] = f"{type(e).__name__}: {e}"
+    response["wall"] = time.perf_counter() - wall_start
+    response["cpu"] = time.process_time() - cpu_start
+    return response
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    Serve newline delimited JSON requests on one connection, one response
+    line per request line.
+    """
+
+    server: "SolverServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class SolverServer(socketserver.ThreadingMixIn, socketserver.BaseServer):
+    """
+    Accepts requests on a thread per connection and runs them on a pool of
+    warm worker processes. Every request for the same day and input goes to
+    the same worker, so it finds the parse and memo tables of the last one.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, workers: Sequence[ProcessPoolExecutor]) -> None:
+        self.workers = workers
+        self.served = 0
+        self._lock = threading.Lock()
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        command = request.get("command", "solve")
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid(), "served": self.served}
+        if command == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        if command != "solve":
+            raise ValueError(f"unknown command {command}")
+
+        day, file_path = int(request["day"]), request["file"]
+        if day not in DAYS:
+            return {"day": day, "error": f"unknown day {day}; days are 1-{max(DAYS)}"}
+        worker = self.workers[hash((day, file_path)) % len(self.workers)]
+        future = worker.submit(
+            solve, day, request.get("part", "part1"), file_path, request.get("options")
+        )
+        response = future.result()
+        with self._lock:
+            self.served += 1
+        return response
+
+
+class UnixSolverServer(SolverServer, socketserver.UnixStreamServer):
+    def __init__(self, path: str, workers: Sequence[ProcessPoolExecutor]) -> None:
+        SolverServer.__init__(self, workers)
+        socketserver.UnixStreamServer.__init__(self, path, _Handler)
+
+
+class TCPSolverServer(SolverServer, socketserver.TCPServer):
+    allow_reuse_address = True
+
+    def __init__(self, port: int, workers: Sequence[ProcessPoolExecutor]) -> None:
+        SolverServer.__init__(self, workers)
+        socketserver.TCPServer.__init__(self, ("127.0.0.1", port), _Handler)
+
+
+def _socket_in_use(socket_path: str) -> bool:
+    """Whether a server is accepting connections on the unix socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(
+    socket_path: str = DEFAULT_SOCKET,
+    port: Optional[int] = None,
+    workers: Optional[int] = None,
+    parsed_inputs: int = 32,
+) -> None:
+    """
+    Run the server until it is sent a shutdown request or interrupted.
+    Raises RuntimeError if another server is live on the unix socket; a stale
+    socket file left by one that died is replaced.
+    """
+    if port is None and os.path.exists(socket_path):
+        if _socket_in_use(socket_path):
+            raise RuntimeError(f"a server is already listening on {socket_path}")
+        os.unlink(socket_path)
+    pool = [
+        ProcessPoolExecutor(1, initializer=_warm_up, initargs=(parsed_inputs,))
+        for _ in range(workers or os.cpu_count() or 1)
+    ]
+    # Start the workers now so the first requests find them warm.
+    for worker in pool:
+        worker.submit(time.sleep, 0)
+
+    if port is not None:
+        server: SolverServer = TCPSolverServer(port, pool)
+        where = f"127.0.0.1:{port}"
+    else:
+        server = UnixSolverServer(socket_path, pool)
+        where = socket_path
+    print(f"Serving on {where} with {len(pool)} workers", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for worker in pool:
+            worker.shutdown(cancel_futures=True)
+        if port is None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def request(
+    message: dict[str, Any], socket_path: str = DEFAULT_SOCKET, port: Optional[int] = None
+) -> dict[str, Any]:
+    """Send one request to a running server and return its response."""
+    if port is not None:
+        connection = socket.create_connection(("127.0.0.1", port))
+    else:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(socket_path)
+    with connection, connection.makefile("rwb") as stream:
+        stream.write(json.dumps(message).encode() + b"\n")
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", "-s", help="unix socket path", default=DEFAULT_SOCKET)
+    parser.add_argument("--port", "-p", help="use localhost TCP on this port", type=int)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serving = commands.add_parser("serve", help="start the server")
+    serving.add_argument(
+        "--workers", "-w", help="worker processes (default one per core)", type=int
+    )
+    serving.add_argument(
+        "--parsed-inputs",
+        help="parsed inputs each worker keeps resident",
+        type=int,
+        default=32,
+    )
+
+    solving = commands.add_parser("solve", help="ask the server for an answer")
+    solving.add_argument("--day", "-d", required=True, type=int)
+    solving.add_argument("--part", default="part1", choices=["part1", "part2"])
+    solving.add_argument("--file", "-f", required=True, type=str)
+    solving.add_argument(
+        "--option",
+        "-o",
+        help="part keyword argument, e.g. -o max_x=11",
+        action="append",
+        default=[],
+    )
+
+    commands.add_parser("ping", help="check the server is up")
+    commands.add_parser("shutdown", help="stop the server")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Keep the solvers warm between calls, e.g.
+    python daemon.py serve -w 4 &
+    python daemon.py solve -d 21 --part part2 -f inputs/day21.txt
+    """
+    args = parse_args(argv)
+    if args.command == "serve":
+        try:
+            serve(args.socket, args.port, args.workers, args.parsed_inputs)
+        except RuntimeError as e:
+            sys.exit(str(e))
+        return
+
+    message: dict[str, Any] = {"command": args.command}
+    if args.command == "solve":
+        options = dict(option.split("=", 1) for option in args.option)
+        message.update(
+            day=args.day,
+            part=args.part,
+            # Workers may not share our working directory.
+            file=os.path.abspath(args.file),
+            options={name: int(value) for name, value in options.items()},
+        )
+    response = request(message, args.socket, args.port)
+    if "error" in response:
+        sys.exit(response["error"])
+    if args.command == "solve":
+        print(response["answer"])
+        print(
+            f"{response['wall']:.4f}s wall, parse "
+            f"{'resident' if response.get('parse_cached') else 'loaded'} "
+            f"in worker {response['pid']}",
+            file=sys.stderr,
+        )
+    else:
+        print(json.dumps(response))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
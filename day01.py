@@ -1,20 +1,419 @@
 import argparse
+import os
+import tempfile
 import numpy as np
-from collections import Counter
 import sys
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from typing import Optional
 
+from instrument import Instruments, add_arguments
+from numparse import MAX_DIGITS, line_ranges, parse_integers
+from parse_cache import cached_parse
+
 
 def sum_differences(left_l, right_l) -> int:
     """Return sum of abs diff of left_l and right_l"""
-    return np.abs(np.sort(left_l) - np.sort(right_l)).sum()
+    return exact_sum(np.abs(np.sort(left_l) - np.sort(right_l)))
+
+
+def frequencies_in_histogram(
+    values: np.ndarray, unique: np.ndarray, counts: np.ndarray
+) -> np.ndarray:
+    """Look up each of values among sorted unique values with their counts."""
+    if len(unique) == 0:
+        return np.zeros(len(values), dtype=np.int64)
+    positions = np.searchsorted(unique, values).clip(max=len(unique) - 1)
+    return np.where(unique[positions] == values, counts[positions], 0)
+
+
+def frequencies_in(values: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """
+    Return how often each of values occurs in other. A bincount of other
+    serves when it is non-negative and its range is no wider than the data,
+    otherwise each value is looked up among np.unique's sorted values with
+    searchsorted.
+    """
+    if len(values) == 0 or len(other) == 0:
+        return np.zeros(len(values), dtype=np.int64)
+    low, high = int(other.min()), int(other.max())
+    if low >= 0 and high <= 2 * (len(values) + len(other)):
+        table = np.bincount(other)
+        found = (values >= 0) & (values <= high)
+        return np.where(found, table[np.where(found, values, 0)], 0)
+    return frequencies_in_histogram(values, *np.unique(other, return_counts=True))
+
+
+def dot_fits_int64(values: np.ndarray, weights: np.ndarray) -> bool:
+    """Whether values . weights (weights non-negative) is sure to fit an int64."""
+    if len(values) == 0:
+        return True
+    largest = max(abs(int(values.min())), abs(int(values.max())))
+    return largest * int(weights.max()) * len(values) < 2**63
+
+
+def exact_sum(values: np.ndarray) -> int:
+    """The sum of values, in int64 when it cannot overflow, else in Python ints."""
+    if len(values) == 0:
+        return 0
+    largest = max(abs(int(values.min())), abs(int(values.max())))
+    if largest * len(values) < 2**63:
+        return int(values.sum())
+    return sum(values.tolist())
+
+
+def exact_dot(values: np.ndarray, weights: np.ndarray) -> int:
+    """
+    The dot product of values and non-negative weights, taken in int64 when
+    it cannot overflow and otherwise in Python ints.
+    """
+    if dot_fits_int64(values, weights):
+        return int(np.dot(values.astype(np.int64), weights))
+    return sum(v * w for v, w in zip(values.tolist(), weights.tolist()))
 
 
 def similarity(left_l, right_l) -> int:
-    """Return sum of left_l times frequency in right_l"""
-    frequency: Counter[int] = Counter(right_l.tolist())
-    return np.array([num * frequency.get(num, 0) for num in left_l]).sum()
+    """
+    Return sum of left_l times frequency in right_l, exactly: when the sum
+    could overflow int64 it is taken over the distinct left values instead.
+    """
+    left_l, right_l = np.asarray(left_l), np.asarray(right_l)
+    frequency = frequencies_in(left_l, right_l)
+    if dot_fits_int64(left_l, frequency):
+        return exact_dot(left_l, frequency)
+
+    unique, counts = np.unique(left_l, return_counts=True)
+    return exact_dot(unique, counts * frequencies_in(unique, right_l))
+
+
+# Bytes of the file parsed at a time by the general parser, and lines at a
+# time by the fixed width one, which bound their temporary arrays.
+CHUNK_SIZE = 1 << 22
+BLOCK_LINES = 1 << 14
+# Smallest write of a spilled partition, so a spill is not bound by opens.
+SPILL_WRITE = 1 << 12
+
+def fixed_width_columns(text: np.ndarray) -> Optional[list[np.ndarray]]:
+    """
+    Parse text whose lines all match the first line's layout, e.g.
+    "12345   67890\n", as a (lines, width) matrix: each column of digits is
+    folded into the numbers directly. Returns one array per number on a
+    line, or None when the lines differ and the general parser is needed.
+    """
+    newlines = np.flatnonzero(text[: 1 << 12] == ord("\n"))
+    if len(newlines) == 0 or len(text) % (newlines[0] + 1):
+        return None
+    width = newlines[0] + 1
+    lines = text.reshape(-1, width)
+    layout = (lines[0] >= ord("0")) & (lines[0] <= ord("9"))
+    edges = np.diff(layout.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    if np.any(lines[0][~layout] > ord(" ")) or np.any(ends - starts > MAX_DIGITS):
+        return None
+    signs = starts[starts > 0] - 1
+
+    columns = [np.empty(len(lines), dtype=np.int64) for _ in starts]
+    for first in range(0, len(lines), BLOCK_LINES):
+        block = lines[first : first + BLOCK_LINES]
+        values = block - np.uint8(ord("0"))
+        # Digits where the first line has them and only non-digits, but no
+        # minus signs, between them.
+        if np.any((values > 9) == layout) or np.any(block[:, signs] == ord("-")):
+            return None
+        for column, start, end in zip(columns, starts, ends):
+            number = values[:, start].astype(np.int64)
+            for c in range(start + 1, end):
+                number *= 10
+                number += values[:, c]
+            column[first : first + len(block)] = number
+    return columns
+
+
+def parse_pairs(text: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Parse whole lines of two integers each into left and right columns."""
+    columns = fixed_width_columns(text)
+    if columns is None:
+        numbers = parse_integers(text)
+        if len(numbers) % 2 == 0:
+            return numbers[0::2].copy(), numbers[1::2].copy()
+    elif len(columns) == 2:
+        return columns[0], columns[1]
+    raise ValueError("text does not hold pairs of numbers")
+
+
+def iter_pairs(
+    file_path: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield the left and right columns of the file chunk_size bytes at a time.
+    The file is memory mapped, so only the current chunk's arrays are held.
+    """
+    if os.path.getsize(file_path) == 0:
+        return
+    text = np.memmap(file_path, dtype=np.uint8, mode="r")
+    for start, end in line_ranges(file_path, chunk_size):
+        yield parse_pairs(text[start:end])
+
+
+def read_columns(
+    file_path: str, chunk_size: int = CHUNK_SIZE
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Read the two whitespace separated integer columns of the file as int64
+    arrays. The file is memory mapped rather than read, and parsed as fixed
+    width lines when it can be, or else chunk_size bytes at a time with
+    each chunk ending at a newline so no number is split.
+    """
+    if os.path.getsize(file_path) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    text = np.memmap(file_path, dtype=np.uint8, mode="r")
+
+    columns = fixed_width_columns(text)
+    if columns is not None:
+        if len(columns) != 2:
+            raise ValueError(f"{file_path} does not hold pairs of numbers")
+        return columns[0], columns[1]
+
+    lefts, rights = zip(*iter_pairs(file_path, chunk_size))
+    return np.concatenate(lefts), np.concatenate(rights)
+
+
+@cached_parse()
+def load_lists(file_path: str) -> tuple[np.ndarray, np.ndarray]:
+    """Read the left and right location lists from the file"""
+    return read_columns(file_path)
+
+
+def load_lists_npy(file_path: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Read the location lists from a file_path + ".npy" sidecar holding both
+    columns, written on first use and reused while it is newer than the
+    text. Unlike load_lists it never reads the text to hash it.
+    """
+    sidecar = file_path + ".npy"
+    if (
+        os.path.exists(sidecar)
+        and os.path.getmtime(sidecar) >= os.path.getmtime(file_path)
+    ):
+        columns = np.load(sidecar, mmap_mode="r")
+        return columns[0], columns[1]
+
+    left, right = read_columns(file_path)
+    directory = os.path.dirname(os.path.abspath(sidecar))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.save(file, np.stack([left, right]))
+        os.replace(tmp_path, sidecar)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return left, right
+
+
+def spill_sorted_runs(
+    file_path: str, chunk_size: int, directory: str
+) -> tuple[list[str], list[str]]:
+    """
+    Sort each chunk's left and right columns and save them as .npy runs in
+    directory. Returns the paths of the left and right runs.
+    """
+    left_runs, right_runs = [], []
+    for i, (left, right) in enumerate(iter_pairs(file_path, chunk_size)):
+        for runs, column, side in ((left_runs, left, "left"), (right_runs, right, "right")):
+            runs.append(os.path.join(directory, f"{side}-{i}.npy"))
+            column.sort()
+            np.save(runs[-1], column)
+    return left_runs, right_runs
+
+
+def merge_runs(paths: Sequence[str], block_size: int) -> Iterator[np.ndarray]:
+    """
+    Yield the values of the sorted runs in order, a block at a time. Every
+    run buffers up to block_size values. All buffered values no greater than
+    the smallest buffer's last value are final, since nothing later in any
+    run can be smaller, so they are sorted and yielded together.
+    """
+    runs = [np.load(path, mmap_mode="r") for path in paths]
+    offsets = [0] * len(runs)
+    while True:
+        buffers = [
+            (i, run[offsets[i] : offsets[i] + block_size])
+            for i, run in enumerate(runs)
+            if offsets[i] < len(run)
+        ]
+        if not buffers:
+            return
+        bound = min(buffer[-1] for _, buffer in buffers)
+        final = []
+        for i, buffer in buffers:
+            taken = int(np.searchsorted(buffer, bound, side="right"))
+            final.append(buffer[:taken])
+            offsets[i] += taken
+        yield np.sort(np.concatenate(final))
+
+
+def sum_differences_external(
+    file_path: str, memory_limit: int, directory: Optional[str] = None
+) -> int:
+    """
+    sum_differences of the file's columns within about memory_limit bytes:
+    each column is externally merge sorted, from sorted runs spilled to
+    directory (a temporary one by default), and the two merged streams are
+    paired off block by block.
+    """
+    if memory_limit <= 0:
+        raise ValueError(f"memory_limit must be positive, not {memory_limit}")
+    chunk_size = max(memory_limit // 16, 1 << 16)
+    with tempfile.TemporaryDirectory(dir=directory) as spill:
+        left_runs, right_runs = spill_sorted_runs(file_path, chunk_size, spill)
+        block_size = max(memory_limit // (64 * max(len(left_runs), 1)), 1024)
+        lefts = merge_runs(left_runs, block_size)
+        rights = merge_runs(right_runs, block_size)
+
+        total = 0
+        left = right = np.empty(0, dtype=np.int64)
+        while True:
+            if len(left) == 0:
+                left = next(lefts, None)
+            if len(right) == 0:
+                right = next(rights, None)
+            if left is None or right is None:
+                break
+            n = min(len(left), len(right))
+            total += exact_sum(np.abs(left[:n] - right[:n]))
+            left, right = left[n:], right[n:]
+        if left is not None or right is not None:
+            raise ValueError(f"{file_path} columns differ in length")
+        return total
+
+
+def spill_partitions(
+    file_path: str,
+    chunk_size: int,
+    partitions: int,
+    directory: str,
+    buffer_size: int = SPILL_WRITE,
+) -> list[tuple[str, str]]:
+    """
+    Append each chunk's values to one of partitions raw int64 files per
+    column, chosen by a hash of the value, so equal values always share a
+    partition. Each partition buffers its values until it holds buffer_size
+    bytes and is only opened to write them out, so the spill takes one open
+    per buffer_size bytes whatever the number of partitions. Returns the
+    (left, right) paths of every partition.
+    """
+    paths = [
+        (os.path.join(directory, f"left-{p}.bin"), os.path.join(directory, f"right-{p}.bin"))
+        for p in range(partitions)
+    ]
+    for pair in paths:
+        for path in pair:
+            open(path, "wb").close()
+    buffers: list[list[list[np.ndarray]]] = [[[], []] for _ in range(partitions)]
+    buffered = [[0, 0] for _ in range(partitions)]
+
+    def flush(p: int, side: int) -> None:
+        with open(paths[p][side], "ab") as file:
+            np.concatenate(buffers[p][side]).tofile(file)
+        buffers[p][side].clear()
+        buffered[p][side] = 0
+
+    for columns in iter_pairs(file_path, chunk_size):
+        for side, column in enumerate(columns):
+            # Fibonacci hashing spreads runs of similar ids over partitions.
+            hashed = column.view(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+            partition = (hashed >> np.uint64(32)) % np.uint64(partitions)
+            order = np.argsort(partition, kind="stable")
+            bounds = np.searchsorted(
+                partition[order], np.arange(partitions + 1, dtype=np.uint64)
+            )
+            for p in np.flatnonzero(np.diff(bounds)).tolist():
+                values = column[order[bounds[p] : bounds[p + 1]]]
+                buffers[p][side].append(values)
+                buffered[p][side] += values.nbytes
+                if buffered[p][side] >= buffer_size:
+                    flush(p, side)
+    for p in range(partitions):
+        for side in (0, 1):
+            if buffers[p][side]:
+                flush(p, side)
+    return paths
+
+
+def read_int64(path: str) -> np.ndarray:
+    """Memory map a raw int64 file (np.memmap refuses empty files)."""
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.memmap(path, dtype=np.int64, mode="r")
+
+
+def histogram(values: np.ndarray, block_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the distinct values and their counts, reading values block_size
+    at a time and merging each block's counts into the running ones.
+    """
+    unique = np.empty(0, dtype=np.int64)
+    counts = np.empty(0, dtype=np.int64)
+    for first in range(0, len(values), block_size):
+        block_unique, block_counts = np.unique(
+            values[first : first + block_size], return_counts=True
+        )
+        unique = np.concatenate([unique, block_unique])
+        counts = np.concatenate([counts, block_counts])
+        order = np.argsort(unique, kind="stable")
+        unique, counts = unique[order], counts[order]
+        starts = np.flatnonzero(np.diff(unique, prepend=unique[0] - 1))
+        unique, counts = unique[starts], np.add.reduceat(counts, starts)
+    return unique, counts
+
+
+def similarity_external(
+    file_path: str, memory_limit: int, directory: Optional[str] = None
+) -> int:
+    """
+    similarity of the file's columns within about memory_limit bytes. Both
+    columns are hash partitioned, spilled to directory (a temporary one by
+    default), into partitions small enough to score in memory. A
+    partition's right side is reduced to a histogram and its left side
+    streamed past it.
+    """
+    if memory_limit <= 0:
+        raise ValueError(f"memory_limit must be positive, not {memory_limit}")
+    chunk_size = max(memory_limit // 16, 1 << 16)
+    # A line of text holds two numbers, each 8 bytes once parsed. There are
+    # never more partitions than the values a chunk holds, so a chunk does
+    # not spread to more partitions than it has values.
+    partitions = -(-os.path.getsize(file_path) * 2 // max(memory_limit // 4, 1))
+    partitions = min(max(partitions, 1), chunk_size // 16)
+    # A quarter of the memory buffers the partitions' writes.
+    buffer_size = max(memory_limit // (8 * partitions), SPILL_WRITE)
+    block_size = max(memory_limit // 64, 1024)
+    total = 0
+    with tempfile.TemporaryDirectory(dir=directory) as spill:
+        for left_path, right_path in spill_partitions(
+            file_path, chunk_size, partitions, spill, buffer_size
+        ):
+            unique, counts = histogram(read_int64(right_path), block_size)
+            left = read_int64(left_path)
+            for first in range(0, len(left), block_size):
+                block = np.asarray(left[first : first + block_size])
+                total += exact_dot(block, frequencies_in_histogram(block, unique, counts))
+    return total
+
+
+def part1(lists: tuple[np.ndarray, np.ndarray]) -> int:
+    return sum_differences(*lists)
+
+
+def part2(lists: tuple[np.ndarray, np.ndarray]) -> int:
+    return similarity(*lists)
+
+
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return value
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
@@ -26,6 +425,20 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         required=True,
         type=str
     )
+    parser.add_argument(
+        "--memory-limit",
+        help="stream the file through disk within about this many MiB",
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--spill-dir", help="where --memory-limit spills (default $TMPDIR)", type=str
+    )
+    parser.add_argument(
+        "--npy",
+        help="load from (and create) a .npy sidecar of the file",
+        action="store_true",
+    )
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -34,11 +447,18 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/1
     """
     args = parse_args(argv)
-    data = np.loadtxt(args.file, dtype=int)
-    left_l = data[:, 0]
-    right_l = data[:, 1]
-    print(f"Part 1: {sum_differences(left_l, right_l)}")
-    print(f"Part 2: {similarity(left_l, right_l)}")
+    instruments = Instruments.from_args(args)
+    if args.memory_limit is not None:
+        limit = args.memory_limit << 20
+        external = (args.file, limit, args.spill_dir)
+        print(f"Part 1: {instruments.run('part1', sum_differences_external, *external)}")
+        print(f"Part 2: {instruments.run('part2', similarity_external, *external)}")
+        return
+
+    loader = load_lists_npy if args.npy else load_lists
+    lists = instruments.run("parse", loader, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, lists)}")
+    print(f"Part 2: {instruments.run('part2', part2, lists)}")
 
 
 if __name__ == "__main__":
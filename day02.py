@@ -1,8 +1,53 @@
 import argparse
 import sys
-from collections.abc import Generator, Sequence
+from collections.abc import Generator, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from typing import Optional
 
+import numpy as np
+
+from instrument import Instruments, add_arguments
+from numparse import count_lines, find_integers, line_numbers, line_ranges
+from parse_cache import cached_parse
+
+# Bytes of the file each streamed chunk holds.
+CHUNK_SIZE = 1 << 22
+
+
+@dataclass(frozen=True, eq=False)
+class Reports:
+    """
+    Every report's levels packed end to end in one int64 array, in
+    compressed sparse row form: report i is values[offsets[i]:offsets[i + 1]].
+    """
+
+    values: np.ndarray
+    offsets: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[int]]) -> "Reports":
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=offsets[1:])
+        values = np.fromiter(
+            (level for row in rows for level in row), dtype=np.int64, count=offsets[-1]
+        )
+        return cls(values, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def rows(self) -> Iterator[list[int]]:
+        """Each report as a list of levels."""
+        values = self.values.tolist()
+        bounds = self.offsets.tolist()
+        for start, end in zip(bounds, bounds[1:]):
+            yield values[start:end]
+
 
 def walk_in_pairs(lst: list[int]) -> Generator[tuple[int, int]]:
     for i in range(len(lst) - 1):
@@ -26,32 +71,165 @@ def is_safe(lst: list[int]) -> bool:
     return True
 
 
-def is_safe_dampner(lst: list[int]) -> bool:
-    """ """
-    if is_safe(lst):
-        return True
+def removals_needed(lst: Sequence[int], direction: int, tolerance: int) -> int:
+    """
+    The fewest levels to remove from lst so that the rest step by 1..3 in
+    direction (1 rising, -1 falling), or tolerance + 1 if that is more.
+
+    With at most tolerance removals a kept level's predecessor is one of the
+    tolerance + 1 levels before it, so cost[j], the fewest removals before a
+    kept level j, only looks back that far. The window of costs is a ring
+    buffer, making this O(len(lst) * tolerance) with no copies of lst.
+    """
+    n = len(lst)
+    if n == 0:
+        return 0
+    width = tolerance + 1
+    cost = [0] * width
+    best = tolerance + 1
+    for j in range(n):
+        fewest = j  # remove every level before j
+        for p in range(max(0, j - width), j):
+            step = (lst[j] - lst[p]) * direction
+            if 1 <= step <= 3:
+                fewest = min(fewest, cost[p % width] + j - p - 1)
+        cost[j % width] = fewest
+        if j >= n - 1 - tolerance:
+            best = min(best, fewest + n - 1 - j)
+    return best
+
+
+def is_safe_dampner(lst: list[int], tolerance: int = 1) -> bool:
+    """Whether lst is safe after removing at most tolerance levels."""
+    return any(
+        removals_needed(lst, direction, tolerance) <= tolerance for direction in (1, -1)
+    )
 
-    for i in range(len(lst)):
-        test_list = lst[:i] + lst[i + 1 :]  # Remove the i-th number
-        if is_safe(test_list):
-            return True
 
-    return False
+def safe_mask(reports: Reports) -> np.ndarray:
+    """
+    is_safe for every report at once. A report is safe when its differences
+    all lie in 1..3 or all lie in -3..-1, so each is checked against both
+    ranges and the checks are and-reduced per report. Returns a boolean
+    array, one entry per report.
+    """
+    lengths = reports.lengths()
+    if len(reports.values) < 2:
+        return np.ones(len(reports), dtype=bool)
 
+    # Difference i is values[i + 1] - values[i]; the last slot pads it to one
+    # per value so a report's differences start at its own offset.
+    diffs = np.diff(reports.values, append=reports.values[-1])
+    rising = (diffs - 1).view(np.uint64) <= 2
+    falling = (-1 - diffs).view(np.uint64) <= 2
+    # The difference after a report's last level straddles two reports.
+    last = reports.offsets[1:][lengths > 0] - 1
+    rising[last] = falling[last] = True
 
-def read_integer_rows(file_path: str) -> list[list[int]]:
-    rows: list[list[int]] = []
-    with open(file_path, "r") as file:
-        for line in file:
-            elements = line.strip().split()
-            int_row = [int(el) for el in elements]
-            rows.append(int_row)
-    return rows
+    starts = reports.offsets[:-1].clip(max=len(diffs) - 1)
+    safe = np.logical_and.reduceat(rising, starts) | np.logical_and.reduceat(
+        falling, starts
+    )
+    # reduceat returns the element at an empty report's start, not True.
+    safe[lengths == 0] = True
+    return safe
+
+
+def parse_reports(text: np.ndarray) -> Reports:
+    """
+    Parse a uint8 array of text, one report per line, into a Reports with
+    array operations. Blank lines are empty (and so safe) reports.
+    """
+    values, starts = find_integers(text)
+    lengths = np.bincount(line_numbers(text, starts), minlength=count_lines(text))
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return Reports(values, offsets)
+
+
+@cached_parse(version=2)
+def read_integer_rows(file_path: str) -> Reports:
+    """Read one report per line into a Reports"""
+    return parse_reports(np.fromfile(file_path, dtype=np.uint8))
+
+
+def count_safe(reports: Reports, tolerance: int = 1) -> tuple[int, int]:
+    """
+    The number of safe reports without and with the Problem Dampener, from
+    a single safe_mask of the reports.
+    """
+    safe = safe_mask(reports)
+    rescued = sum(
+        1
+        for lst, already_safe in zip(reports.rows(), safe.tolist())
+        if not already_safe and is_safe_dampner(lst, tolerance)
+    )
+    num_safe = int(np.count_nonzero(safe))
+    return num_safe, num_safe + rescued
+
+
+def count_safe_in_range(
+    file_path: str, byte_range: tuple[int, int], tolerance: int = 1
+) -> tuple[int, int]:
+    """count_safe of the whole lines between the byte offsets in byte_range."""
+    start, end = byte_range
+    text = np.fromfile(file_path, dtype=np.uint8, count=end - start, offset=start)
+    return count_safe(parse_reports(text), tolerance)
+
+
+def count_safe_streaming(
+    file_path: str,
+    tolerance: int = 1,
+    workers: Optional[int] = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> tuple[int, int]:
+    """
+    count_safe of the file without loading it: it is cut into chunks of
+    whole lines, each read, parsed and counted on its own (on a pool of
+    workers processes when workers is not 1, None for one per core), and
+    the counts summed. Only the chunks in flight are held in memory.
+    """
+    ranges = line_ranges(file_path, chunk_size)
+    count = partial(count_safe_in_range, file_path, tolerance=tolerance)
+    if workers == 1:
+        counts = list(map(count, ranges))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(count, ranges))
+    return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+def part1(reports: Reports) -> int:
+    return int(np.count_nonzero(safe_mask(reports)))
+
+
+def part2(reports: Reports, tolerance: int = 1) -> int:
+    return count_safe(reports, tolerance)[1]
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    parser.add_argument(
+        "--tolerance",
+        "-k",
+        help="levels the Problem Dampener may remove in part 2",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--stream",
+        help="solve both parts in one pass over chunks of the file",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        help="with --stream, processes counting chunks (0 = one per core)",
+        type=int,
+        default=1,
+    )
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -60,12 +238,21 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/2
     """
     args = parse_args(argv)
-    lists: list[list[int]] = read_integer_rows(args.file)
+    instruments = Instruments.from_args(args)
+    if args.stream:
+        num_safe, num_safe2 = instruments.run(
+            "stream", count_safe_streaming, args.file, args.tolerance, args.jobs or None
+        )
+        print(f"Part 1 -> Num Safe: {num_safe}")
+        print(f"Part 2 -> Num Safe: {num_safe2}")
+        return
+
+    reports: Reports = instruments.run("parse", read_integer_rows, args.file)
 
-    num_safe: int = sum([1 if is_safe(lst) else 0 for lst in lists])
+    num_safe: int = instruments.run("part1", part1, reports)
     print(f"Part 1 -> Num Safe: {num_safe}")
 
-    num_safe2: int = sum([1 if is_safe_dampner(lst) else 0 for lst in lists])
+    num_safe2: int = instruments.run("part2", part2, reports, args.tolerance)
     print(f"Part 2 -> Num Safe: {num_safe2}")
 
 
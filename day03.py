@@ -1,56 +1,243 @@
 import argparse
+import mmap
+import os
 import re
 import sys
-from collections.abc import Sequence
-from typing import Optional
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Optional, Union
 
+from instrument import Instruments, add_arguments
 
-def instruction_stream_simple(stream: str) -> int:
+# The longest instruction either part matches, mul(XXX,YYY).
+MAX_INSTRUCTION = len("mul(999,999)")
+# Bytes searched per window of the scan.
+WINDOW = 1 << 20
+
+MUL = re.compile(rb"mul\((?P<x>\d{1,3}),(?P<y>\d{1,3})\)")
+# Every instruction: x and y are set for mul(), dont for don't(), neither for
+# do(). Naming whole alternatives instead hides the literal prefixes from the
+# regex engine and makes the scan about three times slower.
+INSTRUCTION = re.compile(rb"mul\((?P<x>\d{1,3}),(?P<y>\d{1,3})\)|do(?P<dont>n't)?\(\)")
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+def scan(
+    pattern: re.Pattern[bytes],
+    buffer: Buffer,
+    start: int = 0,
+    end: Optional[int] = None,
+    window: int = WINDOW,
+) -> Iterator[re.Match[bytes]]:
+    """
+    Yield the matches of pattern starting in buffer[start:end], searching a
+    window of bytes at a time. Each search reads up to MAX_INSTRUCTION - 1
+    bytes past its window, so a match that starts in one window is found
+    whole there and the next window picks up after it.
+    """
+    end = len(buffer) if end is None else end
+    position = start
+    while position < end:
+        window_end = min(position + window, end)
+        stop = min(window_end + MAX_INSTRUCTION - 1, len(buffer))
+        for match in pattern.finditer(buffer, position, stop):
+            if match.start() >= window_end:
+                break
+            position = match.end()
+            yield match
+        position = max(position, window_end)
+
+
+def instruction_stream_simple(stream: Buffer) -> int:
     """
     Read all mul(X,Y) where X and Y are 1 to 3 digit numbers, and return the
     sum of the all functions.
     """
     sum_result = 0
-    pattern = r'\w{3}\(\d{1,3},\d{1,3}\)'
-    matches = re.findall(pattern, stream)
-    for mem_instr in matches:
-        if mem_instr.startswith('mul'):
-            num1, num2 = map(int, mem_instr[4:-1].split(','))
-            sum_result += num1 * num2
+    for match in scan(MUL, stream):
+        sum_result += int(match["x"]) * int(match["y"])
     return sum_result
 
 
-def instruction_stream(stream: str) -> int:
+@dataclass
+class Evaluation:
+    """
+    Both parts' sums from one scan of the dump, with how many of each
+    instruction it met (disabled counts the mul()s skipped by don't()).
+    """
+
+    total: int = 0
+    enabled_total: int = 0
+    counts: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(("mul", "do", "dont", "disabled"), 0)
+    )
+
+
+def evaluate(stream: Buffer) -> Evaluation:
+    """
+    Run every mul(X,Y), do() and don't() in a single scan, summing all the
+    mul()s for part 1 and those enabled by the last do() or don't() (or the
+    start) for part 2.
+    """
+    total = enabled_total = muls = dos = donts = disabled = 0
+    enabled = True
+    for match in scan(INSTRUCTION, stream):
+        x, y, dont = match.groups()
+        if x is not None:
+            muls += 1
+            product = int(x) * int(y)
+            total += product
+            if enabled:
+                enabled_total += product
+            else:
+                disabled += 1
+        elif dont:
+            donts += 1
+            enabled = False
+        else:
+            dos += 1
+            enabled = True
+    counts = {"mul": muls, "do": dos, "dont": donts, "disabled": disabled}
+    return Evaluation(total, enabled_total, counts)
+
+
+def instruction_stream(stream: Buffer) -> int:
     """
     Read all mul(X,Y), do(), and don't() functions where X and Y are 1 to 3
     digit numbers, and return the sum of the all functions that are enabled.
     Do enables the following functions. Don't() disables the following
     functions.
     """
-    sum_result = 0
-    pattern = r"\w{3}\(\d{1,3},\d{1,3}\)|do\(\)|don't\(\)"
-    matches = re.findall(pattern, stream)
-    evaluate_instruction = True
-    for mem_instr in matches:
-        if mem_instr == "do()":
-            evaluate_instruction = True
-        elif mem_instr == "don't()":
-            evaluate_instruction = False
-        elif evaluate_instruction and mem_instr.startswith('mul'):
-            num1, num2 = map(int, mem_instr[4:-1].split(','))
-            sum_result += num1 * num2
-    return sum_result
+    return evaluate(stream).enabled_total
+
+
+@dataclass(frozen=True)
+class ChunkSums:
+    """
+    What a chunk of the dump contributes, whichever state it starts in:
+    before_toggle sums the mul()s ahead of its first do() or don't(),
+    after_toggle the enabled mul()s from there on, and ends_enabled is the
+    state its last do() or don't() leaves (None when it has neither).
+    """
+
+    before_toggle: int = 0
+    after_toggle: int = 0
+    total: int = 0
+    ends_enabled: Optional[bool] = None
 
+    def enabled_sum(self, enabled: bool) -> int:
+        """The chunk's sum of enabled mul()s when it starts enabled or not."""
+        return self.before_toggle * enabled + self.after_toggle
 
-def read_mem_rows(file_path: str) -> str:
-    with open(file_path, 'r') as file:
-        return file.read()
+    def state_after(self, enabled: bool) -> bool:
+        return enabled if self.ends_enabled is None else self.ends_enabled
+
+
+def chunk_sums(stream: Buffer, start: int = 0, end: Optional[int] = None) -> ChunkSums:
+    """
+    ChunkSums of the instructions starting in stream[start:end]. No
+    instruction can start inside another, so chunks may be cut anywhere.
+    """
+    before_toggle = after_toggle = total = 0
+    enabled: Optional[bool] = None
+    for match in scan(INSTRUCTION, stream, start, end):
+        x, y, dont = match.groups()
+        if x is None:
+            enabled = not dont
+        else:
+            product = int(x) * int(y)
+            total += product
+            if enabled is None:
+                before_toggle += product
+            elif enabled:
+                after_toggle += product
+    return ChunkSums(before_toggle, after_toggle, total, enabled)
+
+
+def chunk_sums_in_file(file_path: str, byte_range: tuple[int, int]) -> ChunkSums:
+    """chunk_sums of a byte range of the file, mapped by the worker itself."""
+    return chunk_sums(read_mem_rows(file_path), *byte_range)
+
+
+def combine(chunks: Sequence[ChunkSums]) -> tuple[int, int]:
+    """
+    Both parts' sums from the chunks in file order: a prefix pass carries
+    the enabled state from each chunk into the next.
+    """
+    enabled = True
+    sum_enabled = 0
+    for chunk in chunks:
+        sum_enabled += chunk.enabled_sum(enabled)
+        enabled = chunk.state_after(enabled)
+    return sum(chunk.total for chunk in chunks), sum_enabled
+
+
+def instruction_streams_parallel(
+    file_path: str, workers: Optional[int] = None, chunk_size: Optional[int] = None
+) -> tuple[int, int]:
+    """
+    Both parts' sums, scanning chunks of the file on a pool of workers
+    processes (one per core when None). Each chunk is summed for both
+    states it could start in, so the chunks are independent and combine
+    gives exactly the sequential answer.
+    """
+    size = os.path.getsize(file_path)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(WINDOW, -(-size // (4 * workers)))
+    ranges = [
+        (start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)
+    ]
+    scan_range = partial(chunk_sums_in_file, file_path)
+    if workers == 1:
+        return combine(list(map(scan_range, ranges)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return combine(list(executor.map(scan_range, ranges)))
+
+
+def read_mem_rows(file_path: str) -> Buffer:
+    """
+    Memory map the dump read-only, so it is scanned in place rather than read
+    and decoded (an empty file, which cannot be mapped, is b"").
+    """
+    with open(file_path, "rb") as file:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b""
+
+
+def part1(instructions: Buffer) -> int:
+    return instruction_stream_simple(instructions)
+
+
+def part2(instructions: Buffer) -> int:
+    return instruction_stream(instructions)
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        help="scan chunks of the dump on this many processes (0 = one per core)",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--counts",
+        help="report how many of each instruction the scan met (not with -j)",
+        action="store_true",
+    )
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.counts and args.jobs != 1:
+        parser.error("--counts is only reported by the sequential scan (-j 1)")
+    return args
 
 
 def main(argv: Optional[Sequence[str]] = None) -> None:
@@ -58,11 +245,22 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/3
     """
     args = parse_args(argv)
-    instructions = read_mem_rows(args.file)
-    sum_result = instruction_stream_simple(instructions)
-    print(f"Part 1 -> {sum_result}")
-    sum_result = instruction_stream(instructions)
-    print(f"Part 2 -> {sum_result}")
+    instruments = Instruments.from_args(args)
+    if args.jobs != 1:
+        part1_sum, part2_sum = instruments.run(
+            "parallel", instruction_streams_parallel, args.file, args.jobs or None
+        )
+        print(f"Part 1 -> {part1_sum}")
+        print(f"Part 2 -> {part2_sum}")
+        return
+
+    instructions = instruments.run("parse", read_mem_rows, args.file)
+    result = instruments.run("evaluate", evaluate, instructions)
+    print(f"Part 1 -> {result.total}")
+    print(f"Part 2 -> {result.enabled_total}")
+    if args.counts:
+        counts = ", ".join(f"{kind} {count}" for kind, count in result.counts.items())
+        print(f"[counts] {counts}", file=sys.stderr)
 
 
 if __name__ == "__main__":
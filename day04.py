@@ -1,86 +1,497 @@
+from __future__ import annotations
 import argparse
 import sys
-from collections.abc import Sequence
-from typing import Generator, Optional, Any
+from collections import deque
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from typing import Optional
 
+import numpy as np
 
-def directions() -> Generator[tuple[int, int], Any, None]:
-    """return all directions"""
-    for x in [-1, 0, 1]:
-        for y in [-1, 0, 1]:
-            if not (x == 0 and y == 0):
-                yield (x, y)
+from grid import ORTHOGONAL, SURROUNDING, Grid
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
 
+# Cells per band when streaming a grid in row bands.
+BAND_CELLS = 1 << 24
 
-def count_word_occurrences(grid: list[list[str]], word: str) -> int:
+# Named sets of (row, col) steps a word may read along.
+DIRECTIONS: dict[str, tuple[tuple[int, int], ...]] = {
+    "all": SURROUNDING,
+    "orthogonal": ORTHOGONAL,
+    "diagonal": tuple((dr, dc) for dr, dc in SURROUNDING if dr and dc),
+    "forward": ((0, 1),),
+    "forward-down": ((0, 1), (1, 0), (1, 1)),
+}
+
+
+def start_window(
+    shape: tuple[int, int], step: tuple[int, int], length: int
+) -> tuple[slice, slice]:
+    """
+    The (rows, cols) slices of the cells a word of length cells can start at
+    and still fit in the grid reading along step.
+    """
+    rows, cols = shape
+    dr, dc = step
+    reach_r, reach_c = dr * (length - 1), dc * (length - 1)
+    return (
+        slice(max(0, -reach_r), max(0, rows - max(0, reach_r))),
+        slice(max(0, -reach_c), max(0, cols - max(0, reach_c))),
+    )
+
+
+def shifted(
+    array: np.ndarray, window: tuple[slice, slice], dr: int, dc: int
+) -> np.ndarray:
+    """The view of array at window moved dr rows and dc columns."""
+    rows, cols = window
+    return array[rows.start + dr : rows.stop + dr, cols.start + dc : cols.stop + dc]
+
+
+def word_starts(
+    letters: np.ndarray,
+    word: str,
+    step: tuple[int, int],
+    masks: Optional[dict[int, np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    A boolean array the shape of letters, True at each cell the word starts
+    at reading along step. masks maps a letter's byte to letters == byte and
+    is filled in for letters not already in it, so it can be shared between
+    calls on the same grid.
+    """
+    masks = {} if masks is None else masks
+    starts = np.zeros(letters.shape, dtype=bool)
+    window = start_window(letters.shape, step, len(word))
+    found = starts[window]
+    if found.size == 0:
+        return starts
+    found[...] = True
+    dr, dc = step
+    for i, byte in enumerate(word.encode("latin-1")):
+        if byte not in masks:
+            masks[byte] = letters == byte
+        np.logical_and(found, shifted(masks[byte], window, i * dr, i * dc), out=found)
+    return starts
+
+
+def count_word_occurrences(
+    grid: Grid, word: str, steps: Sequence[tuple[int, int]] = SURROUNDING
+) -> int:
     """
     Search grid for the number of occurrences of word. Diagonal, Hoirzonatal,
-    Vertical, and reverse are allowed.
-    """
-    rows, cols = len(grid), len(grid[0])
-    word_len = len(word)
-
-    def is_valid(x, y):
-        """Check if the coordinates are within grid boundaries."""
-        return 0 <= x < rows and 0 <= y < cols
-
-    def search_from(x, y, index, dx, dy):
-        """Recursively search for the word in the given direction."""
-        if index == word_len:
-            return 1
-        nx, ny = x + dx, y + dy
-        if not is_valid(nx, ny) or grid[nx][ny] != word[index]:
-            return 0
-        return search_from(nx, ny, index + 1, dx, dy)
-
-    def search(x, y):
-        """Search for the word starting at grid[x][y] in all directions."""
-        count = 0
-        if grid[x][y] == word[0]:
-            for dx, dy in directions():
-                count += search_from(x, y, 1, dx, dy)
-        return count
-
-    total_count = 0
-    for x in range(rows):
-        for y in range(cols):
-            total_count += search(x, y)
-
-    return total_count
-
-
-def search_mas_in_x(grid: list[list[str]], word: str):
-    """Return the count of spaces where MAS forms an X, reversed is ok."""
-    rows, cols = len(grid), len(grid[0])
-
-    def is_valid(x, y):
-        """Check if the coordinates are within grid boundaries."""
-        return 0 <= x < rows and 0 <= y < cols
-
-    def validate_diag(x: int, y: int, direction: list[tuple[int,int]]) -> bool:
-        diag = "".join([grid[x+dx][y+dy] for dx, dy in direction if is_valid(x+dx,y+dy)])
-        if diag == word or diag[::-1] == word:
-            return True
-        return False
-
-    directions = [[(-1, -1), (0, 0), (1, 1)], [(-1, 1), (0, 0), (1, -1)]]
-    total_count = 0
-    for x in range(rows):
-        for y in range(cols):
-            if all([validate_diag(x, y, dir) for dir in directions]):
-                total_count += 1
-    return total_count
-
-
-def read_grid(file_path: str) -> list[list[str]]:
+    Vertical, and reverse are allowed, or only the steps given. Each step is
+    checked for every cell at once by ANDing each letter's mask shifted by
+    its place in the word.
+    """
+    if not word:
+        raise ValueError("Cannot search for an empty word")
+    letters = grid.array()
+    masks: dict[int, np.ndarray] = {}
+    return sum(
+        int(np.count_nonzero(word_starts(letters, word, step, masks))) for step in steps
+    )
+
+
+@dataclass(frozen=True)
+class Automaton:
+    """
+    An Aho-Corasick automaton over bytes: delta[state, byte] is the next
+    state with failure links already followed, and outputs[state] lists the
+    indices of the words ending at that state, suffixes included.
+    """
+
+    words: tuple[str, ...]
+    delta: np.ndarray
+    outputs: tuple[tuple[int, ...], ...]
+
+    @classmethod
+    def build(cls, words: Sequence[str]) -> Automaton:
+        words = tuple(dict.fromkeys(words))
+        if not words or not all(words):
+            raise ValueError("Cannot search for an empty word")
+        children: list[dict[int, int]] = [{}]
+        ends: list[list[int]] = [[]]
+        for index, word in enumerate(words):
+            state = 0
+            for byte in word.encode("latin-1"):
+                if byte not in children[state]:
+                    children[state][byte] = len(children)
+                    children.append({})
+                    ends.append([])
+                state = children[state][byte]
+            ends[state].append(index)
+
+        # Breadth first, so a state's failure target is complete before it.
+        delta = np.zeros((len(children), 256), dtype=np.int32)
+        fail = [0] * len(children)
+        queue = deque()
+        for byte, child in children[0].items():
+            delta[0, byte] = child
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            ends[state].extend(ends[fail[state]])
+            delta[state] = delta[fail[state]]
+            for byte, child in children[state].items():
+                fail[child] = int(delta[fail[state], byte])
+                delta[state, byte] = child
+                queue.append(child)
+        return cls(words, delta, tuple(tuple(e) for e in ends))
+
+
+@dataclass
+class WordSearch:
+    """
+    How many times each word was found and, when asked for, where: hits maps
+    a word to the (row, col, dr, dc) of each start cell and step.
+    """
+
+    counts: dict[str, int]
+    hits: Optional[dict[str, list[tuple[int, int, int, int]]]] = None
+
+
+def line_starts(shape: tuple[int, int], step: tuple[int, int]) -> np.ndarray:
+    """
+    The (row, col) of the first cell of every line of cells along step, the
+    cells whose predecessor is off the grid, longest line first.
+    """
+    rows, cols = shape
+    dr, dc = step
+    first = np.zeros(shape, dtype=bool)
+    first[: max(dr, 0)] = first[rows + min(dr, 0) :] = True
+    first[:, : max(dc, 0)] = first[:, cols + min(dc, 0) :] = True
+    r, c = np.nonzero(first)
+    lengths = np.minimum(
+        (rows - r - 1) // dr + 1 if dr > 0 else (r // -dr + 1 if dr else rows + cols),
+        (cols - c - 1) // dc + 1 if dc > 0 else (c // -dc + 1 if dc else rows + cols),
+    )
+    order = np.argsort(-lengths, kind="stable")
+    return np.stack([r[order], c[order], lengths[order]], axis=1)
+
+
+def search_words(
+    grid: Grid,
+    words: Sequence[str],
+    steps: Sequence[tuple[int, int]] = SURROUNDING,
+    positions: bool = False,
+) -> WordSearch:
+    """
+    Count every word in one pass per step: each line of cells along the step
+    is fed through an Aho-Corasick automaton of all the words, one cell of
+    every line at a time, so the work does not grow with the number of
+    words. With positions, also return where each hit starts.
+    """
+    automaton = Automaton.build(words)
+    letters = grid.array()
+    flat = letters.reshape(-1)
+    ending = np.array([bool(o) for o in automaton.outputs])
+    visits = np.zeros(len(automaton.outputs), dtype=np.int64)
+    hits: Optional[dict[str, list[tuple[int, int, int, int]]]] = (
+        {word: [] for word in automaton.words} if positions else None
+    )
+
+    for dr, dc in steps:
+        starts = line_starts(letters.shape, (dr, dc))
+        if len(starts) == 0:
+            continue
+        start_r, start_c, lengths = starts.T
+        cells = start_r * grid.cols + start_c
+        stride = dr * grid.cols + dc
+        state = np.zeros(len(starts), dtype=np.int32)
+        active = len(starts)
+        matched = []
+        for k in range(int(lengths[0])):
+            while lengths[active - 1] <= k:
+                active -= 1
+            current = state[:active]
+            current[...] = automaton.delta[current, flat[cells[:active]]]
+            cells[:active] += stride
+            (found,) = np.nonzero(ending[current])
+            matched.append(current[found])
+            if hits is not None:
+                for line, end_state in zip(found.tolist(), current[found].tolist()):
+                    end_r = int(start_r[line]) + k * dr
+                    end_c = int(start_c[line]) + k * dc
+                    for index in automaton.outputs[end_state]:
+                        back = len(automaton.words[index]) - 1
+                        hits[automaton.words[index]].append(
+                            (end_r - back * dr, end_c - back * dc, dr, dc)
+                        )
+        # Tally the matching states once per step rather than once per cell,
+        # which would cost the size of the automaton every time.
+        step_visits = np.bincount(np.concatenate(matched))
+        visits[: len(step_visits)] += step_visits
+
+    counts = dict.fromkeys(automaton.words, 0)
+    for state in np.nonzero(ending & (visits > 0))[0].tolist():
+        for index in automaton.outputs[state]:
+            counts[automaton.words[index]] += int(visits[state])
+    return WordSearch(counts, hits)
+
+
+@dataclass(frozen=True)
+class Template:
+    """
+    A small rectangle of letters to find in the grid, where WILDCARD cells
+    match any letter.
+    """
+
+    rows: tuple[str, ...]
+
+    WILDCARD = "."
+
+    def __post_init__(self) -> None:
+        if not self.rows or not self.rows[0]:
+            raise ValueError("A template needs at least one cell")
+        if any(len(row) != len(self.rows[0]) for row in self.rows):
+            raise ValueError("Template rows must all be the same length")
+
+    @classmethod
+    def parse(cls, text: str) -> Template:
+        """A template written with its rows separated by "/", e.g. M.S/.A./M.S."""
+        return cls(tuple(text.split("/")))
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.rows), len(self.rows[0])
+
+    def rotated(self) -> Template:
+        """This template turned a quarter clockwise."""
+        return Template(tuple("".join(column) for column in zip(*reversed(self.rows))))
+
+    def reflected(self) -> Template:
+        """This template mirrored left to right."""
+        return Template(tuple(row[::-1] for row in self.rows))
+
+    def variants(
+        self, rotations: bool = False, reflections: bool = False
+    ) -> list[Template]:
+        """The distinct templates reached by the allowed turns and mirrorings."""
+        variants = [self]
+        if reflections:
+            variants.append(self.reflected())
+        if rotations:
+            for template in list(variants):
+                for _ in range(3):
+                    template = template.rotated()
+                    variants.append(template)
+        return list(dict.fromkeys(variants))
+
+
+def x_template(word: str) -> Template:
+    """
+    word written down both diagonals of a square, crossing at its middle
+    letter, e.g. MAS as M.S/.A./M.S.
+    """
+    if len(word) % 2 == 0:
+        raise ValueError(f"{word} has no middle letter for the diagonals to share")
+    n = len(word)
+    cells = [[Template.WILDCARD] * n for _ in range(n)]
+    for i, letter in enumerate(word):
+        cells[i][i] = cells[n - 1 - i][i] = letter
+    return Template(tuple("".join(row) for row in cells))
+
+
+def template_starts(
+    letters: np.ndarray,
+    template: Template,
+    masks: Optional[dict[int, np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    A boolean array the shape of letters, True at the top left cell of each
+    place template matches, found by ANDing each letter's mask shifted to
+    its cell in the template. masks is shared as in word_starts.
+    """
+    masks = {} if masks is None else masks
+    height, width = template.shape
+    starts = np.zeros(letters.shape, dtype=bool)
+    window = (
+        slice(0, max(0, letters.shape[0] - height + 1)),
+        slice(0, max(0, letters.shape[1] - width + 1)),
+    )
+    found = starts[window]
+    if found.size == 0:
+        return starts
+    found[...] = True
+    for dr, row in enumerate(template.rows):
+        for dc, letter in enumerate(row.encode("latin-1")):
+            if letter == ord(Template.WILDCARD):
+                continue
+            if letter not in masks:
+                masks[letter] = letters == letter
+            np.logical_and(found, shifted(masks[letter], window, dr, dc), out=found)
+    return starts
+
+
+@dataclass
+class TemplateSearch:
+    """
+    How many places a template matched, counting each distinct variant, and
+    when asked for, the (row, col) of each match's top left cell.
+    """
+
+    count: int
+    positions: Optional[list[tuple[int, int]]] = None
+
+
+def search_template(
+    grid: Grid,
+    template: Template,
+    rotations: bool = False,
+    reflections: bool = False,
+    positions: bool = False,
+) -> TemplateSearch:
+    """Find template, turned and mirrored as allowed, anywhere in the grid."""
+    letters = grid.array()
+    masks: dict[int, np.ndarray] = {}
+    count = 0
+    found: Optional[list[tuple[int, int]]] = [] if positions else None
+    for variant in template.variants(rotations, reflections):
+        starts = template_starts(letters, variant, masks)
+        count += int(np.count_nonzero(starts))
+        if found is not None:
+            found.extend(zip(*(axis.tolist() for axis in np.nonzero(starts))))
+    if found is not None:
+        found.sort()
+    return TemplateSearch(count, found)
+
+
+def search_mas_in_x(grid: Grid, word: str) -> int:
+    """
+    Return the count of spaces where MAS forms an X, reversed is ok: the
+    X template of word in any of its four turns.
+    """
+    return search_template(grid, x_template(word), rotations=True).count
+
+
+def row_bands(
+    file_path: str, overlap: int, band_rows: Optional[int] = None
+) -> Iterator[tuple[np.ndarray, int]]:
+    """
+    Read the grid file as (band, own) pairs: band is a (rows, cols) uint8
+    array of consecutive grid rows, of which the first own are this band's
+    and the last overlap are read again as the start of the next band. Only
+    one band is held at a time. Blank lines are skipped as in Grid.
+    """
+    band: list[np.ndarray] = []
+    cols = None
+    with open(file_path, "rb") as file:
+        for line in file:
+            row = line.strip()
+            if not row:
+                continue
+            if cols is None:
+                cols = len(row)
+                band_rows = band_rows or max(1, BAND_CELLS // cols)
+            elif len(row) != cols:
+                raise ValueError("Grid rows must all be the same length")
+            band.append(np.frombuffer(row, dtype=np.uint8))
+            if len(band) == band_rows + overlap:
+                yield np.stack(band), band_rows
+                del band[:band_rows]
+    if band:
+        yield np.stack(band), len(band)
+
+
+def own_count(starts: np.ndarray, own: int, reach: int = 0) -> int:
+    """
+    How many of the matches in starts have their top row among the first own
+    rows, when a match's top row is reach rows from its start (negative for
+    words read upwards). Matches lower down are counted by the next band.
+    """
+    per_row = np.count_nonzero(starts, axis=1)
+    first = max(0, -reach)
+    return int(per_row[first : own - reach].sum())
+
+
+def count_streaming(
+    file_path: str,
+    word: str = "XMAS",
+    steps: Sequence[tuple[int, int]] = SURROUNDING,
+    template: Optional[Template] = None,
+    band_rows: Optional[int] = None,
+) -> tuple[int, int]:
+    """
+    Part 1's count of word along steps and part 2's count of template in its
+    four turns (the X of MAS by default), reading the grid in row bands that
+    overlap by as many rows as a match can span, so the grid is never held
+    whole. Each match is counted by the band that owns its top row.
+    """
+    if not word:
+        raise ValueError("Cannot search for an empty word")
+    variants = (template or x_template("MAS")).variants(rotations=True)
+    reaches = [dr * (len(word) - 1) for dr, _ in steps]
+    overlap = max(
+        [abs(reach) for reach in reaches] + [v.shape[0] - 1 for v in variants]
+    )
+
+    words = templates = 0
+    for band, own in row_bands(file_path, overlap, band_rows):
+        masks: dict[int, np.ndarray] = {}
+        for step, reach in zip(steps, reaches):
+            starts = word_starts(band, word, step, masks)
+            words += own_count(starts, own, min(0, reach))
+        for variant in variants:
+            templates += own_count(template_starts(band, variant, masks), own)
+    return words, templates
+
+
+@cached_parse(version=2)
+def read_grid(file_path: str) -> Grid:
     """Read in our grid from a file"""
-    with open(file_path, 'r') as file:
-        return [list(line.strip()) for line in file.readlines()]
+    return Grid.from_file(file_path)
+
+
+def part1(grid: Grid, word: str = "XMAS", directions: str = "all") -> int:
+    return count_word_occurrences(grid, word, DIRECTIONS[directions])
+
+
+def part2(grid: Grid) -> int:
+    return search_mas_in_x(grid, "MAS")
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    parser.add_argument("--word", help="word part 1 searches for", default="XMAS")
+    parser.add_argument(
+        "--directions",
+        help="directions part 1 reads words along",
+        choices=DIRECTIONS,
+        default="all",
+    )
+    parser.add_argument(
+        "--words",
+        help="also count each of these words in a single pass",
+        nargs="+",
+        default=[],
+    )
+    parser.add_argument(
+        "--template",
+        help="also count a template, rows separated by / and . for any letter "
+        "(e.g. M.S/.A./M.S)",
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "--rotations", help="let templates turn in quarter turns", action="store_true"
+    )
+    parser.add_argument(
+        "--reflections", help="let templates be mirrored", action="store_true"
+    )
+    parser.add_argument(
+        "--stream",
+        help="solve both parts reading the grid in row bands, never holding it whole",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--band-rows",
+        help=f"rows per band with --stream (default {BAND_CELLS} cells' worth)",
+        type=int,
+    )
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -89,9 +500,39 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/4
     """
     args = parse_args(argv)
-    grid = read_grid(args.file)
-    print(f"Part 1: {count_word_occurrences(grid, 'XMAS')}")
-    print(f"Part 2: {search_mas_in_x(grid, 'MAS')}")
+    instruments = Instruments.from_args(args)
+    if args.stream:
+        part1_count, part2_count = instruments.run(
+            "stream",
+            count_streaming,
+            args.file,
+            args.word,
+            DIRECTIONS[args.directions],
+            band_rows=args.band_rows,
+        )
+        print(f"Part 1: {part1_count}")
+        print(f"Part 2: {part2_count}")
+        return
+
+    grid = instruments.run("parse", read_grid, args.file)
+    part1_count = instruments.run("part1", part1, grid, args.word, args.directions)
+    print(f"Part 1: {part1_count}")
+    print(f"Part 2: {instruments.run('part2', part2, grid)}")
+    if args.words:
+        steps = DIRECTIONS[args.directions]
+        found = instruments.run("words", search_words, grid, args.words, steps)
+        for word, count in found.counts.items():
+            print(f"{word}: {count}")
+    for text in args.template:
+        matched = instruments.run(
+            "template",
+            search_template,
+            grid,
+            Template.parse(text),
+            args.rotations,
+            args.reflections,
+        )
+        print(f"{text}: {matched.count}")
 
 
 if __name__ == "__main__":
@@ -1,8 +1,13 @@
 import argparse
+import heapq
 import sys
 from collections.abc import Sequence
+from dataclasses import dataclass
 from typing import Optional
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 def validate(print_run: list[int], rules: dict[int, list[int]]) -> bool:
     """Validate the the printing logic is correct according the rules"""
@@ -15,35 +20,94 @@ def validate(print_run: list[int], rules: dict[int, list[int]]) -> bool:
     return True
 
 
-def insert_before(run: list[int], x: int, before: int) -> list[int]:
-    """We insert all x's prior to 'before' and return the modified list"""
-    y_index = run.index(before)
-    x_values = [num for i, num in enumerate(run) if num == x and i > y_index]
-    others = [num for i, num in enumerate(run) if num != x or i < y_index]
-    new_y_index = others.index(before)
-    result = others[:new_y_index] + x_values + others[new_y_index:]
-    return result
+@dataclass(frozen=True)
+class RuleIndex:
+    """
+    The rules compiled for fast checking: every page in a rule is interned as
+    a small id, and after[id] is a bitset (an int with bit j set) of the ids
+    of the pages that must come after it.
+    """
+
+    ids: dict[int, int]
+    after: list[int]
+
+    @classmethod
+    def compile(cls, rules: dict[int, list[int]]) -> "RuleIndex":
+        ids: dict[int, int] = {}
+        for page, later in rules.items():
+            ids.setdefault(page, len(ids))
+            for x in later:
+                ids.setdefault(x, len(ids))
+        after = [0] * len(ids)
+        for page, later in rules.items():
+            bits = 0
+            for x in later:
+                bits |= 1 << ids[x]
+            after[ids[page]] |= bits
+        return cls(ids, after)
+
+    def validate(self, print_run: Sequence[int]) -> bool:
+        """
+        One pass over print_run with a bitset of the pages seen so far: a
+        page is out of order if a page that must follow it was seen.
+        """
+        ids, after = self.ids, self.after
+        seen = 0
+        for page in print_run:
+            i = ids.get(page)
+            if i is None:
+                continue
+            if after[i] & seen:
+                return False
+            seen |= 1 << i
+        return True
+
+    def validate_all(self, print_runs: Sequence[Sequence[int]]) -> list[bool]:
+        """Whether each print run is in order, as a mask over print_runs."""
+        return [self.validate(print_run) for print_run in print_runs]
+
+
+def fix_order(print_run: list[int], rules: dict[int, list[int]]) -> list[int]:
+    """
+    Reorder print_run so that every rule between its pages holds, with a
+    topological sort of the rules among them. Whenever several pages could
+    come next the one earliest in print_run does, so pages the rules leave
+    free keep their order. Raises ValueError if the rules form a cycle.
+    """
+    positions: dict[int, list[int]] = {}
+    for i, page in enumerate(print_run):
+        positions.setdefault(page, []).append(i)
+    successors = [
+        [j for after in rules.get(page, []) for j in positions.get(after, [])]
+        for page in print_run
+    ]
+    indegree = [0] * len(print_run)
+    for after in successors:
+        for j in after:
+            indegree[j] += 1
+
+    ready = [i for i, degree in enumerate(indegree) if degree == 0]
+    fixed = []
+    while ready:
+        i = heapq.heappop(ready)
+        fixed.append(print_run[i])
+        for j in successors[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                heapq.heappush(ready, j)
+    if len(fixed) != len(print_run):
+        raise ValueError("The rules order the pages of this print run in a cycle")
+    return fixed
 
 
 def validate_and_fix(print_run: list[int], rules: dict[int, list[int]]) -> list[int]:
     """
-    If the solution is not valid, we will recrusively shift the violations
-    until we reach a valid print_run and then return that.
+    If the solution is not valid, return print_run reordered by fix_order,
+    otherwise print_run itself.
     """
     if validate(print_run, rules):
         return print_run
-
-    inncorrect_run = print_run
-    already_printed: dict = {}
-    for page in inncorrect_run:
-        violations = [x for x in rules.get(page, []) if already_printed.get(x, 0)]
-        if len(violations):
-            return validate_and_fix(
-                insert_before(inncorrect_run, page, violations[0]), rules
-            )
-        already_printed[page] = 1
-
-    return inncorrect_run
+    return fix_order(print_run, rules)
 
 
 def find_middle_num(print_run: list[int]) -> int:
@@ -55,6 +119,7 @@ def find_middle_num(print_run: list[int]) -> int:
         return print_run[middle_index]
 
 
+@cached_parse()
 def parse_input(file_path: str) -> tuple[dict[int, list[int]], list[list[int]]]:
     """Read in our grid from a file"""
     with open(file_path, "r") as file:
@@ -78,9 +143,26 @@ def parse_input(file_path: str) -> tuple[dict[int, list[int]], list[list[int]]]:
     return dict_data, list_of_lists
 
 
+def part1(data: tuple[dict[int, list[int]], list[list[int]]]) -> int:
+    rules, print_order = data
+    valid = RuleIndex.compile(rules).validate_all(print_order)
+    return sum(find_middle_num(pr) for pr, ok in zip(print_order, valid) if ok)
+
+
+def part2(data: tuple[dict[int, list[int]], list[list[int]]]) -> int:
+    rules, print_order = data
+    valid = RuleIndex.compile(rules).validate_all(print_order)
+    return sum(
+        find_middle_num(fix_order(pr, rules))
+        for pr, ok in zip(print_order, valid)
+        if not ok
+    )
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -89,17 +171,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/5
     """
     args = parse_args(argv)
-    rules, print_order = parse_input(args.file)
-    total = sum([find_middle_num(pr) for pr in print_order if validate(pr, rules)])
-    print(f"Part 1: {total}")
-    total = sum(
-        [
-            find_middle_num(validate_and_fix(pr, rules))
-            for pr in print_order
-            if not validate(pr, rules)
-        ]
-    )
-    print(f"Part 2: {total}")
+    instruments = Instruments.from_args(args)
+    data = instruments.run("parse", parse_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, data)}")
+    print(f"Part 2: {instruments.run('part2', part2, data)}")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,14 @@
 import argparse
 import sys
 from collections.abc import Sequence
-from copy import deepcopy
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+from grid import Grid
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 class Direction(Enum):
     NORTH = (0, -1)
@@ -40,16 +43,14 @@ def turn_right(d: Direction) -> Direction:
     return turn_map[d]
 
 
-def guards_walking_path(grid:list[list[str]], sp: Location) -> set[tuple[Location, Direction]]:
+def guards_walking_path(grid: Grid, sp: Location) -> set[tuple[Location, Direction]]:
     """
     Return a list of set of spaces and direction the the guard is walking.
     Raises a LoopDetected error when the cycle will never end.
     """
 
-    rows, cols = len(grid), len(grid[0])
-
     def still_on_board(sp: Location) -> bool:
-        return True if 0 <= sp.x < rows and 0 <= sp.y < cols else False
+        return grid.in_bounds(sp.y, sp.x)
 
     path: set = set()
     current_direction = Direction.NORTH
@@ -59,7 +60,7 @@ def guards_walking_path(grid:list[list[str]], sp: Location) -> set[tuple[Locatio
     next_space = current_location.next_space(current_direction)
 
     while still_on_board(next_space):
-        if not grid[next_space.y][next_space.x] == '#':
+        if not grid[next_space.y, next_space.x] == '#':
             current_location = next_space
             next_space = current_location.next_space(current_direction)
             if (current_location, current_direction) in path:
@@ -72,14 +73,12 @@ def guards_walking_path(grid:list[list[str]], sp: Location) -> set[tuple[Locatio
     return path
 
 
-def detect_loops(grid:list[list[str]], sp: Location) -> int:
+def detect_loops(grid: Grid, sp: Location) -> int:
     """
     Insert obsticals are a systematic set of locations based on our knowledge
     of where the guard will walk. If that raises a loop, then we count and we
     return the final count.
     """
-    rows, cols = len(grid), len(grid[0])
-
     steps = guards_walking_path(grid, sp)
     unique_spaces = {t[0] for t in steps}
 
@@ -87,11 +86,11 @@ def detect_loops(grid:list[list[str]], sp: Location) -> int:
     for obsticle_loc in unique_spaces:
         x = obsticle_loc.x
         y = obsticle_loc.y
-        if grid[y][x] == '#' or (sp.x == x and sp.y == y):
+        if grid[y, x] == '#' or (sp.x == x and sp.y == y):
             continue
         try:
-            new_grid = deepcopy(grid)
-            new_grid[y][x] = '#'
+            new_grid = grid.copy()
+            new_grid[y, x] = '#'
             guards_walking_path(new_grid, sp)
         except LoopDetected as e:
             obsticals_creating_loop.append(Location(x, y))
@@ -100,29 +99,38 @@ def detect_loops(grid:list[list[str]], sp: Location) -> int:
     return len(obsticals_creating_loop)
 
 
-def process_grid(file_path: str) -> tuple[list[list[str]], Location]:
+@cached_parse(version=2)
+def process_grid(file_path: str) -> tuple[Grid, Location]:
     """
-    Read the grid from the file into a list of lists, and find the starting
-    point. Return them as tuple.
+    Read the grid from the file, and find the starting point. Return them as
+    tuple.
     """
-    grid = []
+    grid = Grid.from_file(file_path)
     position = Location(0,0)
 
-    with open(file_path, 'r') as file:
-        for row_idx, line in enumerate(file):
-            row = list(line.strip())
-            for col_idx, char in enumerate(row):
-                if char == "^":
-                    position = Location(col_idx, row_idx)
-                    row[col_idx] = "."
-            grid.append(row)
+    start = grid.find("^")
+    if start is not None:
+        position = Location(start[1], start[0])
+        grid[start] = "."
 
     return grid, position
 
 
+def part1(data: tuple[Grid, Location]) -> int:
+    grid, starting_position = data
+    steps = guards_walking_path(grid, starting_position)
+    return len({t[0] for t in steps})
+
+
+def part2(data: tuple[Grid, Location]) -> int:
+    grid, starting_position = data
+    return detect_loops(grid, starting_position)
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -131,14 +139,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/6
     """
     args = parse_args(argv)
-    grid, starting_position = process_grid(args.file)
-
-    steps = guards_walking_path(grid, starting_position)
-    unique_spaces = {t[0] for t in steps}
-    print(f"Part 1: {len(unique_spaces)}")
-
-    loops = detect_loops(grid, starting_position)
-    print(f"Part 2: {loops}")
+    instruments = Instruments.from_args(args)
+    data = instruments.run("parse", process_grid, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, data)}")
+    print(f"Part 2: {instruments.run('part2', part2, data)}")
 
 
 if __name__ == "__main__":
@@ -5,6 +5,9 @@ from typing import Optional
 from functools import partial
 from itertools import product
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 def all_possible(input: list[int], combine: bool = False) -> list[int]:
     """
@@ -40,6 +43,7 @@ def is_possible_concatenation(target: int, input: list[int]) -> bool:
     return target in all_possible(input) or target in all_possible(input, True)
 
 
+@cached_parse()
 def process_input(file_path: str) -> list[tuple[int, list[int]]]:
     """
     Read the grid from the file into a list of lists, and find the starting
@@ -57,9 +61,24 @@ def process_input(file_path: str) -> list[tuple[int, list[int]]]:
     return data_list
 
 
+def part1(equations: list[tuple[int, list[int]]]) -> int:
+    return sum([target for target, nums in equations if is_possible(target, nums)])
+
+
+def part2(equations: list[tuple[int, list[int]]]) -> int:
+    return sum(
+        [
+            target
+            for target, nums in equations
+            if is_possible_concatenation(target, nums)
+        ]
+    )
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -68,20 +87,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/6
     """
     args = parse_args(argv)
-    equations = process_input(args.file)
-    calibration_result = sum(
-        [target for target, nums in equations if is_possible(target, nums)]
-    )
-    print(f"Part 1: {calibration_result}")
-
-    calibration_result = sum(
-        [
-            target
-            for target, nums in equations
-            if is_possible_concatenation(target, nums)
-        ]
-    )
-    print(f"Part 2: {calibration_result}")
+    instruments = Instruments.from_args(args)
+    equations = instruments.run("parse", process_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, equations)}")
+    print(f"Part 2: {instruments.run('part2', part2, equations)}")
 
 
 if __name__ == "__main__":
@@ -6,6 +6,9 @@ from itertools import combinations, chain
 from math import sqrt
 from typing import Optional
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 @dataclass(frozen=True)
 class Point:
@@ -54,6 +57,7 @@ def find_antinodes(
     return antinode_locations
 
 
+@cached_parse()
 def process_input(file_path: str) -> tuple[list[Antenna], int, int]:
     """Returns the list of Antennas and max cols and rows"""
     locations = []
@@ -72,9 +76,20 @@ def process_input(file_path: str) -> tuple[list[Antenna], int, int]:
     return locations, max_length, num_rows
 
 
+def part1(data: tuple[list[Antenna], int, int]) -> int:
+    locations, max_x, max_y = data
+    return len(find_antinodes(locations, max_x, max_y))
+
+
+def part2(data: tuple[list[Antenna], int, int]) -> int:
+    locations, max_x, max_y = data
+    return len(find_antinodes(locations, max_x, max_y, True))
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -83,13 +98,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/8
     """
     args = parse_args(argv)
-    locations, max_x, max_y = process_input(args.file)
-
-    num_antinodes = len(find_antinodes(locations, max_x, max_y))
-    print(f"Part 1: {num_antinodes}")
-
-    num_antinodes = len(find_antinodes(locations, max_x, max_y, True))
-    print(f"Part 2: {num_antinodes}")
+    instruments = Instruments.from_args(args)
+    data = instruments.run("parse", process_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, data)}")
+    print(f"Part 2: {instruments.run('part2', part2, data)}")
 
 
 if __name__ == "__main__":
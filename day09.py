@@ -4,6 +4,9 @@ from collections.abc import Sequence
 from typing import Optional, Union, NewType
 from dataclasses import dataclass
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 @dataclass(frozen=True)
 class File:
@@ -96,15 +99,21 @@ def defragment_whole_files(checksum: list[int]) -> Disk:
     return defragged_disk
 
 
+@cached_parse()
 def parse_input(path: str) -> list[int]:
     with open(path, "r") as file:
         numbers = list(map(int, file.read().strip()))
     return numbers
 
 
+def part2(nums: list[int]) -> int:
+    return disk_to_checksum(defragment_whole_files(nums))
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -113,11 +122,9 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/9
     """
     args = parse_args(argv)
-    nums = parse_input(args.file)
-
-    defragged_disk = defragment_whole_files(nums)
-    checksum = disk_to_checksum(defragged_disk)
-    print(f"Part 2: {checksum}")
+    instruments = Instruments.from_args(args)
+    nums = instruments.run("parse", parse_input, args.file)
+    print(f"Part 2: {instruments.run('part2', part2, nums)}")
 
 
 if __name__ == "__main__":
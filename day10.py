@@ -6,6 +6,10 @@ from enum import Enum
 from dataclasses import dataclass
 from collections import deque
 
+from grid import ORTHOGONAL, Grid
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 @dataclass(frozen=True)
 class Location:
@@ -13,91 +17,115 @@ class Location:
     col: int
 
 
-def find_path(grid: list[list[int]], sp: Location, ep: Location) -> list[Location]:
+def find_path(grid: Grid, sp: Location, ep: Location) -> list[Location]:
     """
     BFS of the grid from this sp to this ep. Not efficient because it walks the grid
     for each pair rather than just each starting point.
     """
-    rows, cols = len(grid), len(grid[0])
-
-    start = (sp.row, sp.col)
-    end = (ep.row, ep.col)
+    cells, cols, size = grid.cells, grid.cols, len(grid.cells)
+    start = grid.index(sp.row, sp.col)
+    end = grid.index(ep.row, ep.col)
 
-    # Directions for movement (up, down, left, right)
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    queue = deque([(*start, [])])
+    # Flat offsets and column steps for movement (up, down, left, right)
+    directions = list(zip(grid.offsets(ORTHOGONAL), (dc for _, dc in ORTHOGONAL)))
+    queue = deque([(start, [])])
     visited = set()
 
     while queue:
-        row, col, path = queue.popleft()
+        index, path = queue.popleft()
 
         # If we reach the target
-        if (row, col) == end:
-            return path + [Location(row, col)]
+        if index == end:
+            return [Location(*grid.position(i)) for i in path + [index]]
 
         # Mark the current cell as visited
-        visited.add(Location(row, col))
+        visited.add(index)
 
         # Explore neighbors
-        for dr, dc in directions:
-            nr, nc = row + dr, col + dc
+        col = index % cols
+        height = cells[index] + 1
+        for offset, dc in directions:
+            nxt = index + offset
             if (
-                0 <= nr < rows
-                and 0 <= nc < cols
-                and Location(nr, nc) not in visited
-                and (grid[nr][nc] - grid[row][col]) == 1
+                0 <= nxt < size
+                and 0 <= col + dc < cols
+                and nxt not in visited
+                and cells[nxt] == height
             ):
-                queue.append((nr, nc, path + [Location(row, col)]))
+                queue.append((nxt, path + [index]))
 
     return []
 
 
-def count_trails_from_x(grid: list[list[int]], sp: Location) -> int:
+def count_trails_from_x(grid: Grid, sp: Location) -> int:
     """
     Depth first search of the grid to find the number of unique trails
     This starting point will yield. Returns that as a count.
     """
+    cells, cols, size = grid.cells, grid.cols, len(grid.cells)
+    directions = list(zip(grid.offsets(ORTHOGONAL), (dc for _, dc in ORTHOGONAL)))
 
-    def dfs(row, col, visited):
+    def dfs(index, visited):
         # If we reach a cell with 9, count this as one valid path
-        if grid[row][col] == 9:
+        if cells[index] == 9:
             return 1
 
         # Mark current cell as visited
-        visited.add((row, col))
+        visited.add(index)
 
         # Explore neighbors
         paths = 0
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nr, nc = row + dr, col + dc
+        col = index % cols
+        height = cells[index] + 1
+        for offset, dc in directions:
+            nxt = index + offset
             if (
-                0 <= nr < rows
-                and 0 <= nc < cols
-                and (nr, nc) not in visited
-                and (grid[nr][nc] - grid[row][col]) == 1
+                0 <= nxt < size
+                and 0 <= col + dc < cols
+                and nxt not in visited
+                and cells[nxt] == height
             ):
-                paths += dfs(nr, nc, visited)
+                paths += dfs(nxt, visited)
 
         # Backtrack
-        visited.remove((row, col))
+        visited.remove(index)
         return paths
 
-    rows, cols = len(grid), len(grid[0])
-    return dfs(sp.row, sp.col, set())
+    return dfs(grid.index(sp.row, sp.col), set())
+
+
+@cached_parse(version=2)
+def parse_input(path: str) -> Grid:
+    """Read the map with each cell holding its height 0-9"""
+    return Grid.from_file(path, digits=True)
+
+
+def find_values(grid: Grid, value: int) -> list[Location]:
+    """Return the locations of every cell in the grid holding value"""
+    return [Location(row, col) for row, col in grid.find_all(value)]
+
+
+def part1(topological_map: Grid) -> int:
+    ending_points = find_values(topological_map, 9)
+    count = 0
+    for sp in find_values(topological_map, 0):
+        for ep in ending_points:
+            if len(find_path(topological_map, sp, ep)) > 0:
+                count += 1
+    return count
 
 
-def parse_input(path: str) -> list[list[int]]:
-    nested_list = []
-    with open(path, "r") as file:
-        for line in file:
-            numbers = list(line.strip())
-            nested_list.append([int(num) for num in numbers])
-    return nested_list
+def part2(topological_map: Grid) -> int:
+    count = 0
+    for sp in find_values(topological_map, 0):
+        count += count_trails_from_x(topological_map, sp)
+    return count
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -106,32 +134,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/8
     """
     args = parse_args(argv)
-    topological_map = parse_input(args.file)
-
-    starting_points = [
-        Location(row_idx, col_idx)
-        for row_idx, row in enumerate(topological_map)
-        for col_idx, val in enumerate(row)
-        if val == 0
-    ]
-    ending_points = [
-        Location(row_idx, col_idx)
-        for row_idx, row in enumerate(topological_map)
-        for col_idx, val in enumerate(row)
-        if val == 9
-    ]
-
-    count = 0
-    for sp in starting_points:
-        for ep in ending_points:
-            if len(find_path(topological_map, sp, ep)) > 0:
-                count += 1
-    print(f"Part 1: {count}")
-
-    count = 0
-    for sp in starting_points:
-        count += count_trails_from_x(topological_map, sp)
-    print(f"Part 2: {count}")
+    instruments = Instruments.from_args(args)
+    topological_map = instruments.run("parse", parse_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, topological_map)}")
+    print(f"Part 2: {instruments.run('part2', part2, topological_map)}")
 
 
 if __name__ == "__main__":
@@ -4,6 +4,9 @@ from collections.abc import Sequence
 from typing import Optional
 from functools import lru_cache
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 def stones_after_x_blinks(stones: list[int], x: int) -> int:
     @lru_cache(maxsize=None)
@@ -37,15 +40,25 @@ def stones_after_x_blinks(stones: list[int], x: int) -> int:
     return sum([_recurse_blinks(stone, x) for stone in stones])
 
 
+@cached_parse()
 def parse_input(path: str) -> list[int]:
     with open(path, "r") as file:
         numbers = list(map(int, file.read().split()))
     return numbers
 
 
+def part1(nums: list[int]) -> int:
+    return stones_after_x_blinks(nums, 25)
+
+
+def part2(nums: list[int]) -> int:
+    return stones_after_x_blinks(nums, 75)
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -54,9 +67,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/8
     """
     args = parse_args(argv)
-    nums = parse_input(args.file)
-    print(f"Part 1: {stones_after_x_blinks(nums, 25)}")
-    print(f"Part 2: {stones_after_x_blinks(nums, 75)}")
+    instruments = Instruments.from_args(args)
+    nums = instruments.run("parse", parse_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, nums)}")
+    print(f"Part 2: {instruments.run('part2', part2, nums)}")
 
 
 if __name__ == "__main__":
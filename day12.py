@@ -1,61 +1,53 @@
+from __future__ import annotations
 import argparse
-import networkx as nx
 import sys
 from collections.abc import Sequence
 from typing import Optional
 
+import numpy as np
 
-def get_sumproduct_area_and_perimeter(graph: nx.Graph) -> int:
-    """Multiply area and perimeter for each island, and return the sum"""
-    total_cost = 0
-    for component in nx.connected_components(graph):
-        subgraph = graph.subgraph(component)
-        area = len(component)
-        perimeter = sum([4 - degree for node, degree in subgraph.degree()])
-        total_cost += area * perimeter
-    return total_cost
+from graph import CSRGraph, connected_components, from_grid
+from grid import Grid
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
 
 
-def read_file_to_grid(filename: str) -> list[list[str]]:
-    """Read the file into a 2D grid"""
-    with open(filename, "r") as file:
-        grid = [list(line.strip()) for line in file.readlines()]
-    return grid
+def get_sumproduct_area_and_perimeter(graph: CSRGraph) -> int:
+    """Multiply area and perimeter for each island, and return the sum"""
+    labels = connected_components(graph)
+    area = np.bincount(labels, minlength=graph.num_nodes)
+    perimeter = np.bincount(labels, weights=4 - graph.degree(), minlength=graph.num_nodes)
+    return int((area * perimeter.astype(np.int64)).sum())
 
 
-def create_graph_from_grid(grid) -> nx.Graph:
-    """Create a graph from the grid"""
-    G = nx.Graph()
-    rows, cols = len(grid), len(grid[0])
+def read_file_to_grid(filename: str) -> Grid:
+    """Read the file into a 2D grid"""
+    return Grid.from_file(filename)
 
-    # Add edges for adjacent matching letters
-    for r in range(rows):
-        for c in range(cols):
-            current_node = (r, c)
-            G.add_node(current_node, letter=grid[r][c])
 
-            # Check right
-            if c + 1 < cols and grid[r][c] == grid[r][c + 1]:
-                G.add_edge(current_node, (r, c + 1))
+def create_graph_from_grid(grid: Grid) -> CSRGraph:
+    """
+    Create a graph from the grid, with a node per plot (r * cols + c) and
+    edges between adjacent matching letters.
+    """
+    letters = grid.array()
+    return from_grid(np.ones(letters.shape, dtype=bool), regions=letters)
 
-            # Check down
-            if r + 1 < rows and grid[r][c] == grid[r + 1][c]:
-                G.add_edge(current_node, (r + 1, c))
 
-            # Check left
-            if c - 1 >= 0 and grid[r][c] == grid[r][c - 1]:
-                G.add_edge(current_node, (r, c - 1))
+@cached_parse(version=2)
+def load_graph(filename: str) -> CSRGraph:
+    """Read the garden plots file and build its graph"""
+    return create_graph_from_grid(read_file_to_grid(filename))
 
-            # Check up
-            if r - 1 >= 0 and grid[r][c] == grid[r - 1][c]:
-                G.add_edge(current_node, (r - 1, c))
 
-    return G
+def part1(graph: CSRGraph) -> int:
+    return get_sumproduct_area_and_perimeter(graph)
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -64,11 +56,9 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/12
     """
     args = parse_args(argv)
-    grid = read_file_to_grid(args.file)
-    graph = create_graph_from_grid(grid)
-
-    total_cost = get_sumproduct_area_and_perimeter(graph)
-    print(f"Part 1: {total_cost}")
+    instruments = Instruments.from_args(args)
+    graph = instruments.run("parse", load_graph, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, graph)}")
 
 
 if __name__ == "__main__":
@@ -7,6 +7,9 @@ from typing import Optional
 from heapq import heappush, heappop
 from math import sqrt
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 @dataclass(frozen=True)
 class Position:
@@ -50,6 +53,7 @@ def solve_equation(target: Position, moves: list[Move], offset: int = 0) -> int:
     return 0
 
 
+@cached_parse()
 def parse_input_and_generate_data(path):
     """
     Parses the input text to extract Button moves and Prize positions.
@@ -85,9 +89,20 @@ def parse_input_and_generate_data(path):
     return games
 
 
+def part1(games: list[tuple[Position, list[Move]]]) -> int:
+    return sum([solve_equation(target, moves) for target, moves in games])
+
+
+def part2(games: list[tuple[Position, list[Move]]]) -> int:
+    return sum(
+        [solve_equation(target, moves, 10000000000000) for target, moves in games]
+    )
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -96,23 +111,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/13
     """
     args = parse_args(argv)
-    data = parse_input_and_generate_data(args.file)
-
-    costs = sum(
-        [
-            solve_equation(target, moves)
-            for target, moves in parse_input_and_generate_data(args.file)
-        ]
-    )
-    print(f"Part 1: {costs}")
-
-    costs = sum(
-        [
-            solve_equation(target, moves, 10000000000000)
-            for target, moves in parse_input_and_generate_data(args.file)
-        ]
-    )
-    print(f"Part 2: {costs}")
+    instruments = Instruments.from_args(args)
+    games = instruments.run("parse", parse_input_and_generate_data, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, games)}")
+    print(f"Part 2: {instruments.run('part2', part2, games)}")
 
 
 if __name__ == "__main__":
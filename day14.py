@@ -1,12 +1,14 @@
 import argparse
 import sys
 from collections.abc import Sequence
+from copy import deepcopy
 from typing import Optional
 from dataclasses import dataclass
 from functools import reduce
 from operator import mul
 
-from numpy.lib.function_base import average
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
 
 
 @dataclass(frozen=True)
@@ -136,6 +138,7 @@ def mean_adjacency(robots: list[Robot]) -> float:
     return sum(adjacent_positions.values()) / len(adjacent_positions)
 
 
+@cached_parse()
 def parse_robots_from_file(filename: str) -> list[Robot]:
     """
     Parse positions from a file with format 'p=x,y v=vx,vy'.
@@ -168,6 +171,35 @@ def parse_robots_from_file(filename: str) -> list[Robot]:
     return robots
 
 
+def part1(robots: list[Robot], max_x: int = 101, max_y: int = 103) -> int:
+    """Safety factor after 100 seconds: product of robots per quadrant."""
+    robots = deepcopy(robots)
+    seconds = 100
+    quadrants = {1: 0, 2: 0, 3: 0, 4: 0}
+    [obj.move(max_x, max_y) for _ in range(seconds) for obj in robots]
+    for obj in robots:
+        quad = obj.p.get_quadrant(max_x, max_y)
+        if quad is not None:
+            quadrants[quad] += 1
+    return reduce(mul, [v for k, v in quadrants.items()])
+
+
+def part2(robots: list[Robot], max_x: int = 101, max_y: int = 103) -> Optional[int]:
+    """
+    Return the first second with a suffienctly high amount of adjacent robots,
+    which is when the christmas tree appears.
+    """
+    robots = deepcopy(robots)
+    seconds = 100000
+    for i in range(seconds):
+        [obj.move(max_x, max_y) for obj in robots]
+        mean_adjacent = mean_adjacency(robots)
+        if mean_adjacent > 1.5:
+            # print_robots(robots, max_x, max_y)
+            return i + 1
+    return None
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
@@ -177,6 +209,7 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "--maxy", "-y", help="height of grid", required=True, type=int, default=7
     )
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -185,28 +218,13 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/14
     """
     args = parse_args(argv)
-    robots = parse_robots_from_file(args.file)
+    instruments = Instruments.from_args(args)
+    robots = instruments.run("parse", parse_robots_from_file, args.file)
 
     # Part 1: python day14.py -f inputs/day14.txt -x 101 -y 103
-    seconds = 100
-    quadrants = {1: 0, 2: 0, 3: 0, 4: 0}
-    [obj.move(args.maxx, args.maxy) for _ in range(seconds) for obj in robots]
-    for obj in robots:
-        quad = obj.p.get_quadrant(args.maxx, args.maxy)
-        if quad is not None:
-            quadrants[quad] += 1
-    print(f"Part 1: {reduce(mul, [v for k, v in quadrants.items()])}")
-
-    # Part 2: Print out possible versions when we have a suffienctly high
-    # amount of adjacent robots.
-    seconds = 100000
-    for i in range(seconds):
-        [obj.move(args.maxx, args.maxy) for obj in robots]
-        mean_adjacent = mean_adjacency(robots)
-        if mean_adjacent > 1.5:
-            print(i + 1)
-            # print_robots(robots, args.maxx, args.maxy)
-            break
+    sizes = (args.maxx, args.maxy)
+    print(f"Part 1: {instruments.run('part1', part1, robots, *sizes)}")
+    print(f"Part 2: {instruments.run('part2', part2, robots, *sizes)}")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,13 @@
 import argparse
 import sys
 from collections.abc import Sequence
-from dataclasses import dataclass, field
-from types import new_class
 from typing import Optional
 from enum import Enum
 
+from grid import Grid
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 class Direction(Enum):
     UP = (-1, 0)
@@ -24,16 +26,6 @@ class Direction(Enum):
         return mapping.get(char, None)
 
 
-@dataclass
-class OccupiedPosition:
-    row: int
-    col: int
-    obj: str
-
-    def distance(self) -> int:
-        return 100 * self.row + self.col
-
-
 def move_robot(puzzle_path: str) -> int:
     """
     Simulate the robots movement from the puzzle input and return the sum of
@@ -41,108 +33,91 @@ def move_robot(puzzle_path: str) -> int:
     :param puzzle_path: str, file path of the input logic
     :returns: int
     """
+    return simulate(*parse_input(puzzle_path))
 
-    def move_once(idx: int, move: str) -> Optional[dict[int, tuple[int, int]]]:
-        if objects[idx].obj == "#":
-            return None  # cannot move walls.
 
-        dir = Direction.from_char(move)
+def push(grid: Grid, robot: tuple[int, int], direction: Direction) -> tuple[int, int]:
+    """
+    Try to move the robot one step, pushing any boxes in the way. Nothing moves
+    if a wall blocks any of them. Returns the robot's new position.
+    :param grid: Grid warehouse, updated in place
+    :param robot: tuple[int, int] robot's position
+    :param direction: Direction
+    :returns: tuple[int, int]
+    """
+    d_row, d_col = direction.value
+    vertical = d_row != 0
+
+    # Breadth first, so every cell is queued before any cell further ahead of
+    # it. In part 2 double wide boxes pull their other half along when moving
+    # up or down.
+    to_move = [robot]
+    queued = {robot}
+    for r, c in to_move:
+        ahead = (r + d_row, c + d_col)
+        obj = grid[ahead]
+        if obj == "#":
+            return robot
+        if obj == ".":
+            continue
+        blocking = [ahead]
+        if vertical and obj == "[":
+            blocking.append((ahead[0], ahead[1] + 1))
+        elif vertical and obj == "]":
+            blocking.append((ahead[0], ahead[1] - 1))
+        for position in blocking:
+            if position not in queued:
+                queued.add(position)
+                to_move.append(position)
+
+    for r, c in reversed(to_move):
+        grid[r + d_row, c + d_col] = grid[r, c]
+        grid[r, c] = "."
+    return robot[0] + d_row, robot[1] + d_col
+
+
+def simulate(grid: Grid, moves: list[str]) -> int:
+    """
+    Move the robot through moves, pushing boxes, and return the sum of the gps
+    coordinates of the boxes. grid is updated in place.
+    :param grid: Grid walls, boxes and the robot
+    :param moves: list[str] of "^", "v", "<" and ">"
+    :returns: int
+    """
+    robot = grid.find("@")
+    if robot is None:
+        raise ValueError("No robot in the warehouse")
+
+    for m in moves:
+        dir = Direction.from_char(m)
         if dir is None:
-            raise ValueError(f"{move} is not understood")
-        d_row, d_col = dir.value
-        new_row, new_col = objects[idx].row + d_row, objects[idx].col + d_col
-
-        required_moves = {}
-        for blocking_idx, blocking_obj in enumerate(objects):
-            if new_row == blocking_obj.row and new_col == blocking_obj.col:
-                # In part 2, we have to deal with double wide boxes, which may create
-                # adjancent boxes to care about when moving up or down.
-                adjacent_obj_idx = None
-                if blocking_obj.obj == "[" and dir in [Direction.UP, Direction.DOWN]:
-                    adjacent_obj_idx = [
-                        idx
-                        for idx, x in enumerate(objects)
-                        if x.row == blocking_obj.row
-                        and x.col == blocking_obj.col + 1
-                        and x.obj == "]"
-                    ][0]
-                elif blocking_obj.obj == "]" and dir in [Direction.UP, Direction.DOWN]:
-                    adjacent_obj_idx = [
-                        idx
-                        for idx, x in enumerate(objects)
-                        if x.row == blocking_obj.row
-                        and x.col == blocking_obj.col - 1
-                        and x.obj == "["
-                    ][0]
-
-                # If we have an adjacent box, let's try to recursively move it and
-                # return the list of moves.
-                if adjacent_obj_idx is not None:
-                    child_moves_adj = move_once(adjacent_obj_idx, move)
-                    if child_moves_adj is None:
-                        return None
-                    else:
-                        required_moves = required_moves | child_moves_adj
-
-                # Let's try to recursively move child boxes and return the list of
-                # moves.
-                child_moves = move_once(blocking_idx, move)
-                if child_moves is None:
-                    return None
-                else:
-                    required_moves = required_moves | child_moves
-
-        # Assuming we have not failed yet, let's add the current space to the
-        # list of moves.
-        required_moves[idx] = (new_row, new_col)
-        return required_moves
-
-    # Read puzzle input
-    objects = find_positions(puzzle_path)
-    moves = find_moves(puzzle_path)
-
-    for m_count, m in enumerate(moves):
-        robot = [idx for idx, obj in enumerate(objects) if obj.obj == "@"][0]
-        required_moves = move_once(robot, m)
-
-        # if None, then moves in this direction are not possible, so just move on.
-        if required_moves is not None:
-            for idx, move in required_moves.items():
-                objects[idx].row = move[0]
-                objects[idx].col = move[1]
+            raise ValueError(f"{m} is not understood")
+        robot = push(grid, robot, dir)
 
     # After all moves, return the GPS coordinates of the boxes.
-    sum_gps = sum([b.distance() for b in objects if b.obj in ["[", "O"]])
-    return sum_gps
+    boxes = grid.find_all("O") + grid.find_all("[")
+    return sum([100 * row + col for row, col in boxes])
 
 
-def find_positions(file_path: str) -> list[OccupiedPosition]:
-    """Finds all positions of a given symbol in the list of lines."""
-    positions = []
+@cached_parse(version=2)
+def parse_input(file_path: str) -> tuple[Grid, list[str]]:
+    """Read the warehouse grid and the robot's moves, which follow a blank line."""
     with open(file_path, "r") as file:
-        lines = [line.strip() for line in file.readlines()]
-        for row, line in enumerate(lines):
-            for col, char in enumerate(line):
-                if char in ["@", "#", "O", "[", "]"]:
-                    positions.append(OccupiedPosition(row, col, char))
-    return positions
+        warehouse, moves = file.read().split("\n\n", 1)
+    return Grid.from_lines(warehouse.splitlines()), [
+        char for char in moves if char in ["^", "v", "<", ">"]
+    ]
 
 
-def find_moves(file_path: str) -> list[str]:
-    """Finds all moves of a given symbol in the list of lines."""
-    moves = []
-    with open(file_path, "r") as file:
-        lines = [line.strip() for line in file.readlines()]
-        for row, line in enumerate(lines):
-            for col, char in enumerate(line):
-                if char in ["^", "v", "<", ">"]:
-                    moves.append(char)
-    return moves
+def part1(data: tuple[Grid, list[str]]) -> int:
+    grid, moves = data
+    return simulate(grid.copy(), moves)
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -151,8 +126,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/15
     """
     args = parse_args(argv)
+    instruments = Instruments.from_args(args)
 
-    sum_gps = move_robot(args.file)
+    data = instruments.run("parse", parse_input, args.file)
+    sum_gps = instruments.run("part1", part1, data)
     print(f"{sum_gps}")
 
 
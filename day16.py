@@ -5,9 +5,14 @@ from collections.abc import Sequence
 from typing import Optional
 from collections import defaultdict
 
+from grid import Grid
+
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 def find_all_paths(
-    grid: list[list[str]], start: tuple[int, int], end: tuple[int, int], start_dir: str
+    grid: Grid, start: tuple[int, int], end: tuple[int, int], start_dir: str
 ) -> list:
     """
     Finds all possible paths and their costs from start to end inside of grid,
@@ -57,9 +62,8 @@ def find_all_paths(
             for direction, (dx, dy) in directions.items():
                 nx, ny = x + dx, y + dy
                 if (
-                    0 <= nx < len(grid)
-                    and 0 <= ny < len(grid[0])
-                    and grid[nx][ny] == "."
+                    grid.in_bounds(nx, ny)
+                    and grid[nx, ny] == "."
                     and (nx, ny) not in path
                 ):  # Prevent cycles
                     turn_cost = calculate_turn_cost(current_dir, direction)
@@ -72,32 +76,50 @@ def find_all_paths(
     return traverse()
 
 
+def lowest_cost(paths: list) -> int:
+    """Return the cost of the cheapest path"""
+    return min([p.get("cost", None) for p in paths if p.get("cost", None) is not None])
+
+
+def tiles_on_best_paths(paths: list) -> int:
+    """Return the number of unique tiles touched by any of the cheapest paths"""
+    min_cost = lowest_cost(paths)
+    points = set()
+    for d in paths:
+        if d.get("cost", 0) == min_cost:
+            points.update(d.get("path", []))
+    return len(points)
+
+
+def part1(data: tuple[Grid, tuple[int, int], tuple[int, int]]) -> int:
+    grid, start, end = data
+    return lowest_cost(find_all_paths(grid, start, end, "east"))
+
+
+def part2(data: tuple[Grid, tuple[int, int], tuple[int, int]]) -> int:
+    grid, start, end = data
+    return tiles_on_best_paths(find_all_paths(grid, start, end, "east"))
+
+
+@cached_parse(version=2)
 def read_grid_from_file(
     file_path: str,
-) -> tuple[list[list[str]], tuple[int, int], tuple[int, int]]:
+) -> tuple[Grid, tuple[int, int], tuple[int, int]]:
     """
     Read puzzel input and return the grid, and starting and ending locations
     """
-    with open(file_path, "r") as file:
-        grid = [list(line.strip()) for line in file.readlines()]
-        s = e = (0, 0)
-        for r_idx, row in enumerate(grid):
-            for c_idx, v in enumerate(row):
-                if v == "S":
-                    s = (r_idx, c_idx)
-                    grid[r_idx][c_idx] = "."
-                elif v == "E":
-                    e = (r_idx, c_idx)
-                    grid[r_idx][c_idx] = "."
-
-        return grid, s, e
-
-    return [], (0, 0), (0, 0)
+    grid = Grid.from_file(file_path)
+    s, e = grid.find("S"), grid.find("E")
+    for position in (s, e):
+        if position is not None:
+            grid[position] = "."
+    return grid, s or (0, 0), e or (0, 0)
 
 
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -106,18 +128,11 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/16
     """
     args = parse_args(argv)
-    grid, start, end = read_grid_from_file(args.file)
-    paths = find_all_paths(grid, start, end, "east")
-    min_cost = min(
-        [p.get("cost", None) for p in paths if p.get("cost", None) is not None]
-    )
-    print(f"Part 1: {min_cost}")
-
-    points = set()
-    for d in paths:
-        if d.get("cost", 0) == min_cost:
-            points.update(d.get("path", []))
-    print(f"Part 2: {len(points)}")
+    instruments = Instruments.from_args(args)
+    grid, start, end = instruments.run("parse", read_grid_from_file, args.file)
+    paths = instruments.run("paths", find_all_paths, grid, start, end, "east")
+    print(f"Part 1: {instruments.run('part1', lowest_cost, paths)}")
+    print(f"Part 2: {instruments.run('part2', tiles_on_best_paths, paths)}")
 
 
 if __name__ == "__main__":
@@ -2,7 +2,10 @@ import argparse
 import sys
 from collections.abc import Sequence
 from typing import Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
 
 
 @dataclass
@@ -157,6 +160,7 @@ def find_a(program: list[int]) -> int:
     return reg_a if reg_a is not None else 0
 
 
+@cached_parse()
 def parse_input(file_path: str) -> tuple[Computer, list[int]]:
     register_a = register_b = register_c = 0
     program = []
@@ -176,9 +180,23 @@ def parse_input(file_path: str) -> tuple[Computer, list[int]]:
     return Computer(register_a, register_b, register_c), program
 
 
+def part1(data: tuple[Computer, list[int]]) -> str:
+    computer, program = data
+    result = run_program(replace(computer), program)
+    return ",".join([str(x) for x in result])
+
+
+def part2(data: tuple[Computer, list[int]]) -> int:
+    _, program = data
+    reg_a = find_a(program)
+    assert run_program(Computer(reg_a, 0, 0), program) == program
+    return reg_a
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -217,14 +235,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     comp = Computer(729, 0, 0)
     assert run_program(comp, [0, 1, 5, 4, 3, 0]) == [4, 6, 3, 5, 6, 3, 5, 2, 1, 0]
 
-    computer, program = parse_input(args.file)
-    result = run_program(computer, program)
-    print("Part 1: " + ",".join([str(x) for x in result]))
-
-    computer, program = parse_input(args.file)
-    reg_a = find_a(program)
-    assert run_program(Computer(reg_a, 0, 0), program) == program
-    print(f"Part 2: {reg_a}")
+    instruments = Instruments.from_args(args)
+    data = instruments.run("parse", parse_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, data)}")
+    print(f"Part 2: {instruments.run('part2', part2, data)}")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,15 @@
+from __future__ import annotations
 import argparse
 import sys
 from collections.abc import Sequence
 from typing import Optional
 from dataclasses import dataclass
-import networkx as nx
+
+import numpy as np
+
+from graph import UNREACHABLE, bfs, from_grid
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
 
 
 @dataclass
@@ -12,30 +18,27 @@ class Point:
     y: int
 
 
-def create_grid_graph(maxx: int, maxy: int) -> nx.Graph:
-    # Initialize an empty graph
-    G = nx.Graph()
-
-    # Add nodes and edges
-    for x in range(maxx):
-        for y in range(maxy):
-            G.add_node((x, y))
-
-            # Add edges to neighbors
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                neighbor = (x + dx, y + dy)
-                if 0 <= neighbor[0] < maxx and 0 <= neighbor[1] < maxy:
-                    G.add_edge((x, y), neighbor)
+def open_cells(maxx: int, maxy: int, blocked_points: list[Point]) -> np.ndarray:
+    """Return a (maxx, maxy) boolean array, False where a byte has fallen"""
+    passable = np.ones((maxx, maxy), dtype=bool)
+    if blocked_points:
+        passable[[p.x for p in blocked_points], [p.y for p in blocked_points]] = False
+    return passable
 
-    return G
 
-
-def remove_blocked_nodes(graph: nx.Graph, blocked_points: list[Point]) -> None:
-    # Convert blocked points to a set of tuples
-    blocked_set = {(point.x, point.y) for point in blocked_points}
-    graph.remove_nodes_from(blocked_set)
+def shortest_path_length(
+    maxx: int, maxy: int, blocked_points: list[Point]
+) -> Optional[int]:
+    """
+    Shortest path from (0, 0) to (maxx - 1, maxy - 1) around the blocked
+    points, or None when they cut the exit off.
+    """
+    # Node x * maxy + y is the cell (x, y), so the exit is the last node.
+    distances = bfs(from_grid(open_cells(maxx, maxy, blocked_points)), 0)
+    return None if distances[-1] == UNREACHABLE else int(distances[-1])
 
 
+@cached_parse()
 def parse_input(file_path: str) -> list[Point]:
     blocked_points: list[Point] = []
 
@@ -47,12 +50,42 @@ def parse_input(file_path: str) -> list[Point]:
     return blocked_points
 
 
+def part1(
+    blocked_points: list[Point], maxx: int = 71, maxy: int = 71, bytes_fallen: int = 1024
+) -> Optional[int]:
+    """
+    Shortest path from corner to corner after bytes_fallen bytes have landed,
+    or None when they cut the exit off
+    """
+    return shortest_path_length(maxx, maxy, blocked_points[:bytes_fallen])
+
+
+def part2(
+    blocked_points: list[Point], maxx: int = 71, maxy: int = 71, bytes_fallen: int = 1024
+) -> Optional[Point]:
+    """Return the first byte that cuts the path from corner to corner"""
+    if shortest_path_length(maxx, maxy, blocked_points) is not None:
+        return None
+
+    # Once the path is cut it stays cut, so binary search for the first
+    # number of fallen bytes without a path.
+    low, high = bytes_fallen, len(blocked_points)
+    while low < high:
+        middle = (low + high) // 2
+        if shortest_path_length(maxx, maxy, blocked_points[: middle + 1]) is None:
+            high = middle
+        else:
+            low = middle + 1
+    return blocked_points[low]
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
     parser.add_argument("--maxx", type=int, default=71)
     parser.add_argument("--maxy", type=int, default=71)
     parser.add_argument("--bytes_fallen", type=int, default=1024)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -61,21 +94,14 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/18
     """
     args = parse_args(argv)
-    graph = create_grid_graph(args.maxx, args.maxy)
-    blocked_points = parse_input(args.file)
-
-    remove_blocked_nodes(graph, blocked_points[: args.bytes_fallen])
-    path_len = nx.shortest_path_length(graph, (0, 0), (args.maxx - 1, args.maxy - 1))
-    print(f"Part 1: {path_len}")
-
-    # remove one at a time, until we raise a no path exception.
-    for point in blocked_points[args.bytes_fallen :]:
-        remove_blocked_nodes(graph, [point])
-        try:
-            _ = nx.shortest_path_length(graph, (0, 0), (args.maxx - 1, args.maxy - 1))
-        except nx.NetworkXNoPath:
-            print(f"Part 2: {point}")
-            break
+    instruments = Instruments.from_args(args)
+    blocked_points = instruments.run("parse", parse_input, args.file)
+    sizes = (args.maxx, args.maxy, args.bytes_fallen)
+    print(f"Part 1: {instruments.run('part1', part1, blocked_points, *sizes)}")
+
+    point = instruments.run("part2", part2, blocked_points, *sizes)
+    if point is not None:
+        print(f"Part 2: {point}")
 
 
 if __name__ == "__main__":
@@ -4,6 +4,9 @@ from collections.abc import Sequence
 from typing import Optional
 from functools import lru_cache
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 @lru_cache
 def is_possible(pattern: str, remaining_towels: frozenset[str]) -> bool:
@@ -31,6 +34,7 @@ def is_possible_xways(pattern: str, remaining_towels: frozenset[str]) -> int:
     return success
 
 
+@cached_parse()
 def parse_input(file_path: str) -> tuple[frozenset[str], list[str]]:
     towels = []
     patterns = []
@@ -45,9 +49,20 @@ def parse_input(file_path: str) -> tuple[frozenset[str], list[str]]:
     return frozenset(towels), patterns
 
 
+def part1(data: tuple[frozenset[str], list[str]]) -> int:
+    towels, desired_patterns = data
+    return sum([1 for pattern in desired_patterns if is_possible(pattern, towels)])
+
+
+def part2(data: tuple[frozenset[str], list[str]]) -> int:
+    towels, desired_patterns = data
+    return sum([is_possible_xways(pattern, towels) for pattern in desired_patterns])
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -57,17 +72,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     """
     args = parse_args(argv)
 
-    towels, desired_patterns = parse_input(args.file)
-    sum_possible = sum(
-        [1 for pattern in desired_patterns if is_possible(pattern, towels)]
-    )
-    print(f"Part 1: {sum_possible}")
-
-    towels, desired_patterns = parse_input(args.file)
-    sum_possible = sum(
-        [is_possible_xways(pattern, towels) for pattern in desired_patterns]
-    )
-    print(f"Part 2: {sum_possible}")
+    instruments = Instruments.from_args(args)
+    data = instruments.run("parse", parse_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, data)}")
+    print(f"Part 2: {instruments.run('part2', part2, data)}")
 
 
 if __name__ == "__main__":
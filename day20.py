@@ -1,106 +1,118 @@
+from __future__ import annotations
 import argparse
-import networkx as nx
 import sys
 from collections.abc import Sequence
 from typing import Optional
 
+import numpy as np
 
-def parse_file(file_path: str) -> list[list[str]]:
+from graph import UNREACHABLE, bfs, from_grid
+from grid import Grid
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
+
+def parse_file(file_path: str) -> Grid:
     """Read the file into an nxm grid"""
-    grid = []
-    with open(file_path, "r") as file:
-        for line in file.readlines():
-            grid.append(list(line.strip()))
-    return grid
+    return Grid.from_file(file_path)
 
 
-def parse_grid_and_create_graph(
-    grid: list[list[str]],
-) -> tuple[nx.Graph, tuple[int, int], tuple[int, int]]:
+def find_start_and_end(grid: Grid) -> tuple[tuple[int, int], tuple[int, int]]:
     """
-    converts a nxm grid into a network where '.' are the path, 'S' is the start,
-    and 'E' is the end.
-    :param grid: list[list[str]]
-    :returns: nx.Graph (our graph), start and end as tuple[int, int]
+    Replace 'S' and 'E' in the grid with '.', as they are part of the track,
+    and return their positions.
+    :param grid: Grid
+    :returns: start and end as tuple[int, int]
     """
-    start = end = (0, 0)
-    graph = nx.Graph()
-    rows, cols = len(grid), len(grid[0])
-
-    # Replace 'S' and 'E' with '.' and record their positions
-    for r in range(rows):
-        for c in range(cols):
-            if grid[r][c] == "S":
-                start = (r, c)
-                grid[r][c] = "."
-            elif grid[r][c] == "E":
-                end = (r, c)
-                grid[r][c] = "."
-
-    # Helper function to get neighbors
-    def get_neighbors(r, c):
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == ".":
-                yield (nr, nc)
-
-    # Build the graph
-    for r in range(rows):
-        for c in range(cols):
-            if grid[r][c] == ".":
-                graph.add_node((r, c))
-                for neighbor in get_neighbors(r, c):
-                    graph.add_edge((r, c), neighbor)
-
-    return graph, start, end
-
-
-def manh_dist(n1: tuple[int, int], n2: tuple[int, int]) -> int:
-    """computes the manhattan distance bwetween two points."""
-    return abs(n1[0] - n2[0]) + abs(n1[1] - n2[1])
+    start, end = grid.find("S"), grid.find("E")
+    for position in (start, end):
+        if position is not None:
+            grid[position] = "."
+    return start or (0, 0), end or (0, 0)
+
+
+def track_distances(grid: Grid, source: tuple[int, int]) -> np.ndarray:
+    """
+    Steps along the track ('.') from source to every cell, as a (rows, cols)
+    array holding UNREACHABLE for walls and cells the track does not reach.
+    """
+    graph = from_grid(grid.array() == ord("."))
+    return bfs(graph, grid.index(*source)).reshape(grid.rows, grid.cols)
 
 
 def find_cheats_that_save_x(
-    graph: nx.Graph,
+    grid: Grid,
     start: tuple[int, int],
     end: tuple[int, int],
     x: int = 100,
     dist: int = 2,
 ) -> int:
     """
-    Find the number of 'cheats' that save at least 100 steps.
-    :param graph: nx.Graph
+    Find the number of 'cheats' that save at least x steps. A cheat jumps from
+    a track cell to any track cell within dist manhattan distance, and saves
+    the normal race time less the steps to its start, the jump, and the steps
+    from its end. Each jump offset is checked for every cell at once.
+    :param grid: Grid racetrack
     :param start: tuple[int, int] starting node
     :param end: tuple[int, int] ending node
     :param x: int the minimum amount of savings required to be counted
-    :returns: tuple[int, int] with number of 'cheats' that save x and max savings.
+    :param dist: int the longest cheat allowed
+    :returns: int number of 'cheats' that save x
     """
-    unaltered_shortest_path = nx.shortest_path_length(graph, start, end)
+    from_start = track_distances(grid, start)
+    to_end = track_distances(grid, end)
+    unaltered_shortest_path = from_start[end]
+    if unaltered_shortest_path == UNREACHABLE:
+        return 0
 
-    computed = {}
+    rows, cols = grid.rows, grid.cols
     count_greater_than_x = 0
-    for node1 in sorted(nx.descendants(graph, start) | {start}):
-        for node2 in sorted(nx.descendants(graph, end) | {end}):
-            distance_of_cheat = manh_dist(node1, node2)
-            if (
-                0 < distance_of_cheat <= dist
-                and computed.get(frozenset([node1, node2]), None) is None
-            ):
-                savings = unaltered_shortest_path - (
-                    nx.shortest_path_length(graph, start, node1)
-                    + distance_of_cheat
-                    + nx.shortest_path_length(graph, node2, end)
+    for dr in range(-dist, dist + 1):
+        for dc in range(-(dist - abs(dr)), dist - abs(dr) + 1):
+            distance_of_cheat = abs(dr) + abs(dc)
+            if distance_of_cheat == 0 or abs(dr) >= rows or abs(dc) >= cols:
+                continue
+            # Cheat starts at (r, c) in here and ends at (r + dr, c + dc) in there.
+            here = from_start[
+                max(0, -dr) : rows - max(0, dr), max(0, -dc) : cols - max(0, dc)
+            ]
+            there = to_end[
+                max(0, dr) : rows + min(0, dr), max(0, dc) : cols + min(0, dc)
+            ]
+            savings = unaltered_shortest_path - (here + distance_of_cheat + there)
+            count_greater_than_x += int(
+                np.count_nonzero(
+                    (here != UNREACHABLE) & (there != UNREACHABLE) & (savings >= x)
                 )
-                computed[frozenset([node1, node2])] = savings
-                if savings >= x:
-                    count_greater_than_x += 1
+            )
 
     return count_greater_than_x
 
 
+@cached_parse(version=2)
+def load_racetrack(
+    file_path: str,
+) -> tuple[Grid, tuple[int, int], tuple[int, int]]:
+    """Read the racetrack grid, with its start and end"""
+    grid = parse_file(file_path)
+    start, end = find_start_and_end(grid)
+    return grid, start, end
+
+
+def part1(data: tuple[Grid, tuple[int, int], tuple[int, int]]) -> int:
+    grid, start, end = data
+    return find_cheats_that_save_x(grid, start, end, 100)
+
+
+def part2(data: tuple[Grid, tuple[int, int], tuple[int, int]]) -> int:
+    grid, start, end = data
+    return find_cheats_that_save_x(grid, start, end, 100, 20)
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -109,13 +121,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/20
     """
     args = parse_args(argv)
-    grid = parse_file(args.file)
-    graph, start, end = parse_grid_and_create_graph(grid)
-    # effective_cheats = find_cheats_that_save_x(graph, start, end, 100)
-    # print(f"Part 1: {effective_cheats}")
-
-    effective_cheats = find_cheats_that_save_x(graph, start, end, 100, 20)
-    print(f"Part 2: {effective_cheats}")
+    instruments = Instruments.from_args(args)
+    data = instruments.run("parse", load_racetrack, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, data)}")
+    print(f"Part 2: {instruments.run('part2', part2, data)}")
 
 
 if __name__ == "__main__":
@@ -1,37 +1,41 @@
+from __future__ import annotations
 import argparse
-import networkx as nx
 import re
 import sys
 from collections.abc import Sequence
+from dataclasses import dataclass
 from functools import cache
 from itertools import product, combinations, chain
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
+if TYPE_CHECKING:
+    from graph import CSRGraph
 
-def grid_to_graph(grid: list[list[str]]) -> nx.Graph:
-    """create a networkx graph from a grid"""
-    G = nx.Graph()
-    rows = len(grid)
-    cols = len(grid[0])
 
-    for i in range(rows):
-        for j in range(cols):
-            if grid[i][j] != "X":  # Skip "X"
-                G.add_node((i, j), value=grid[i][j])
-                for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    ni, nj = i + di, j + dj
-                    if 0 <= ni < rows and 0 <= nj < cols and grid[ni][nj] != "X":
-                        G.add_edge((i, j), (ni, nj))
+@dataclass(frozen=True, eq=False)
+class Keypad:
+    graph: CSRGraph
+    cols: int
+    keys: dict[str, int]
 
-    return G
 
+def grid_to_graph(grid: list[list[str]]) -> Keypad:
+    """create a graph of the keypad's keys from a grid, skipping "X" """
+    import numpy as np
+    from graph import from_grid
 
-def get_node_by_value(graph, target_value):
-    """Look up an node in the Graph by the readable value."""
-    for node, data in graph.nodes(data=True):
-        if data.get("value") == target_value:
-            return node
-    return None
+    passable = np.array([[key != "X" for key in row] for row in grid])
+    cols = len(grid[0])
+    keys = {
+        key: r * cols + c
+        for r, row in enumerate(grid)
+        for c, key in enumerate(row)
+        if key != "X"
+    }
+    return Keypad(from_grid(passable), cols, keys)
 
 
 def direction_symbol(p1: tuple[int, int], p2: tuple[int, int]) -> str:
@@ -53,26 +57,30 @@ def direction_symbol(p1: tuple[int, int], p2: tuple[int, int]) -> str:
         raise ValueError("Not directly adjacent or invalid input")
 
 
-def create_numpad_graph() -> nx.Graph:
+@cache
+def create_numpad_graph() -> Keypad:
     grid = [["7", "8", "9"], ["4", "5", "6"], ["1", "2", "3"], ["X", "0", "A"]]
     return grid_to_graph(grid)
 
 
-def create_arrows_graph() -> nx.Graph:
+@cache
+def create_arrows_graph() -> Keypad:
     grid = [["X", "^", "A"], ["<", "v", ">"]]
     return grid_to_graph(grid)
 
 
+@cache
 def shortest_pad_paths_from_a_b(a: str, b: str, padtype: str = "arrows") -> list[str]:
     """
     Returns the short paths from a to b in steps. pattype determins the graph we use.
     """
-    graph = ARROWS_G if padtype == "arrows" else NUMPAD_G
-    start_node = get_node_by_value(graph, a)
-    end_node = get_node_by_value(graph, b)
+    from graph import all_shortest_paths
+
+    pad = create_arrows_graph() if padtype == "arrows" else create_numpad_graph()
     paths = []
-    for path in nx.all_shortest_paths(graph, start_node, end_node):
-        paths.append([direction_symbol(s, e) for s, e in zip(path, path[1:])])
+    for path in all_shortest_paths(pad.graph, pad.keys[a], pad.keys[b]):
+        steps = [divmod(node, pad.cols) for node in path]
+        paths.append([direction_symbol(s, e) for s, e in zip(steps, steps[1:])])
     return ["".join(p) + "A" for p in paths]
 
 
@@ -155,9 +163,24 @@ def solve(codes: list[str], n: int) -> int:
     return total
 
 
+@cached_parse()
+def parse_input(file_path: str) -> list[str]:
+    with open(file_path, "r") as file:
+        return [line.strip() for line in file.readlines()]
+
+
+def part1(codes: list[str]) -> int:
+    return solve(codes, 2)
+
+
+def part2(codes: list[str]) -> int:
+    return solve(codes, 25)
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -166,8 +189,8 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     https://adventofcode.com/2024/day/21
     """
     args = parse_args(argv)
-    with open(args.file, "r") as file:
-        codes = [line.strip() for line in file.readlines()]
+    instruments = Instruments.from_args(args)
+    codes = instruments.run("parse", parse_input, args.file)
 
     # optimal_slow = (
     #     min([compute_shortest_seq_lenth(p, 2) for p in shortest_paths("029A", "numpad")])
@@ -176,11 +199,9 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     # optimal_fast = solve(["029A"], 2)
     # assert optimal_slow == optimal_fast
 
-    print(f"Part 1: {solve(codes, 2)}")
-    print(f"Part 2: {solve(codes, 25)}")
+    print(f"Part 1: {instruments.run('part1', part1, codes)}")
+    print(f"Part 2: {instruments.run('part2', part2, codes)}")
 
 
 if __name__ == "__main__":
-    NUMPAD_G = create_numpad_graph()
-    ARROWS_G = create_arrows_graph()
     main(sys.argv[1:])
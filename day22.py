@@ -7,6 +7,9 @@ from functools import reduce
 import operator
 from typing import Optional, Generator, Union, Iterable
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 def compute_next_secret(s: int) -> int:
     """Compute the next secet in the sequence given the input."""
@@ -62,9 +65,24 @@ def find_best_pattern(secrets: list[int]) -> int:
     return max(best_patterns.values())
 
 
+@cached_parse()
+def parse_input(file_path: str) -> list[int]:
+    with open(file_path, "r") as file:
+        return [int(line.strip()) for line in file if line.strip().isdigit()]
+
+
+def part1(numbers: list[int]) -> int:
+    return sum([compute_xth_secrect(x, 2000) for x in numbers])
+
+
+def part2(numbers: list[int]) -> int:
+    return find_best_pattern(numbers)
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -81,15 +99,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     assert list(differences) == [-3, 6, -1, -1, 0, 2, -2, 0, -2]
 
     args = parse_args(argv)
-    with open(args.file, "r") as file:
-        numbers = [int(line.strip()) for line in file if line.strip().isdigit()]
-
-        # Part 1
-        part1 = sum([compute_xth_secrect(x, 2000) for x in numbers])
-        print(f"Part 1: {part1}")
-
-        # Part 2
-        print(f"Part 2: {find_best_pattern(numbers)}")
+    instruments = Instruments.from_args(args)
+    numbers = instruments.run("parse", parse_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, numbers)}")
+    print(f"Part 2: {instruments.run('part2', part2, numbers)}")
 
 
 if __name__ == "__main__":
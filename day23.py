@@ -4,6 +4,9 @@ from collections.abc import Sequence
 from typing import Optional
 from itertools import combinations
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 def find_triplets_containing_t_node(graph: dict) -> list[tuple[str, str, str]]:
     """Find all triplets that have one node that starts with 't'"""
@@ -42,9 +45,32 @@ def find_largest_neighborhood(graph: dict) -> list[str]:
     return sorted(max(neighborhoods, key=len))
 
 
+@cached_parse()
+def parse_input(file_path: str) -> dict[str, set[str]]:
+    """Parse edges into an adjacency list"""
+    with open(file_path, "r") as file:
+        edges = [edge.strip() for edge in file.readlines()]
+
+    graph = {}
+    for edge in edges:
+        node1, node2 = edge.split("-")
+        graph.setdefault(node1, set()).add(node2)
+        graph.setdefault(node2, set()).add(node1)
+    return graph
+
+
+def part1(graph: dict) -> int:
+    return len(find_triplets_containing_t_node(graph))
+
+
+def part2(graph: dict) -> str:
+    return ",".join(find_largest_neighborhood(graph))
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -52,21 +78,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     """https://adventofcode.com/2024/day/23"""
 
     args = parse_args(argv)
-    edges = []
-    with open(args.file, "r") as file:
-        edges = [edge.strip() for edge in file.readlines()]
-
-    # Parse edges into an adjacency list
-    graph = {}
-    for edge in edges:
-        node1, node2 = edge.split("-")
-        graph.setdefault(node1, set()).add(node2)
-        graph.setdefault(node2, set()).add(node1)
-
-    print(f"Part 1: {len(find_triplets_containing_t_node(graph))}")
-
-    lg_neighborhood = find_largest_neighborhood(graph)
-    print(f"Part 2: {','.join(lg_neighborhood)}")
+    instruments = Instruments.from_args(args)
+    graph = instruments.run("parse", parse_input, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, graph)}")
+    print(f"Part 2: {instruments.run('part2', part2, graph)}")
 
 
 if __name__ == "__main__":
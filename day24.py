@@ -7,6 +7,9 @@ from enum import Enum
 from functools import cache
 from typing import Optional, FrozenSet, Tuple, TypeAlias
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 class GateType(Enum):
     AND = "AND"
@@ -56,6 +59,7 @@ class LogicGate(_GateBase):
             raise ValueError(f"Unknown gate type: {self.gate_type}")
 
 
+@cached_parse()
 def parse_gates_from_file(filename: str) -> frozenset[tuple[str, _GateBase]]:
     gates = []
 
@@ -84,9 +88,23 @@ def parse_gates_from_file(filename: str) -> frozenset[tuple[str, _GateBase]]:
     return frozenset(gates)
 
 
+def z_bits(gates: GateStorage) -> list[str]:
+    """The z wires' values as "0"/"1", most significant first."""
+    return [
+        str(int(gate.evaluate(gates)))
+        for name, gate in sorted(gates, key=lambda x: x[0], reverse=True)
+        if name.startswith("z")
+    ]
+
+
+def part1(gates: GateStorage) -> int:
+    return int("".join(z_bits(gates)), 2)
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -94,14 +112,10 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     """https://adventofcode.com/2024/day/23"""
 
     args = parse_args(argv)
-    gates = parse_gates_from_file(args.file)
-
-    binary = [
-        str(int(gate.evaluate(gates)))
-        for name, gate in sorted(gates, key=lambda x: x[0], reverse=True)
-        if name.startswith("z")
-    ]
-    print(f"Part 1: {int(''.join(binary), 2)} <- {binary}")
+    instruments = Instruments.from_args(args)
+    gates = instruments.run("parse", parse_gates_from_file, args.file)
+    answer = instruments.run("part1", part1, gates)
+    print(f"Part 1: {answer} <- {z_bits(gates)}")
 
 
 if __name__ == "__main__":
@@ -3,6 +3,9 @@ import sys
 from collections.abc import Sequence
 from typing import Optional
 
+from instrument import Instruments, add_arguments
+from parse_cache import cached_parse
+
 
 def process_grids(grids: list[list[str]]) -> tuple[list[list[int]], list[list[int]]]:
     def transpose_horizontal(matrix):
@@ -59,9 +62,23 @@ def parse_file(filename: str) -> list[list[str]]:
     return grids
 
 
+@cached_parse()
+def load_locks_and_keys(filename: str) -> tuple[list[list[int]], list[list[int]]]:
+    return process_grids(parse_file(filename))
+
+
+def part1(data: tuple[list[list[int]], list[list[int]]]) -> int:
+    locks, keys = data
+    fitting_pairs = 0
+    for lock in locks:
+        fitting_pairs += sum([1 for key in keys if does_not_overlap(key, lock)])
+    return fitting_pairs
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", "-f", help="input file", required=True, type=str)
+    add_arguments(parser)
     return parser.parse_args(argv)
 
 
@@ -69,12 +86,9 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     """https://adventofcode.com/2024/day/25"""
 
     args = parse_args(argv)
-    grids = parse_file(args.file)
-    locks, keys = process_grids(grids)
-    fitting_pairs = 0
-    for lock in locks:
-        fitting_pairs += sum([1 for key in keys if does_not_overlap(key, lock)])
-    print(f"Part 1: {fitting_pairs}")
+    instruments = Instruments.from_args(args)
+    data = instruments.run("parse", load_locks_and_keys, args.file)
+    print(f"Part 1: {instruments.run('part1', part1, data)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,545 @@
+import argparse
+import json
+import os
+import random
+import string
+import sys
+from collections.abc import Callable, Sequence
+from math import isqrt
+from typing import Optional
+
+# Each generator returns the puzzle text plus any keyword options the day's
+# part functions need to make sense of it (grid sizes for days 14 and 18).
+Generated = tuple[str, dict[str, int]]
+
+
+def _side(base: int, scale: int) -> int:
+    """Grow a grid side so that the number of cells grows with scale."""
+    return max(2, round(base * scale**0.5))
+
+
+def _grid_text(grid: list[list[str]]) -> str:
+    return "\n".join("".join(row) for row in grid) + "\n"
+
+
+def _maze(rng: random.Random, side: int, loops: float = 0.0) -> list[list[str]]:
+    """
+    Carve a maze with an iterative depth first search over the odd cells of a
+    side x side grid of walls. loops is the chance of knocking out an extra
+    wall, which adds alternative routes.
+    """
+    side = side if side % 2 == 1 else side + 1
+    grid = [["#"] * side for _ in range(side)]
+    stack = [(1, 1)]
+    grid[1][1] = "."
+    while stack:
+        r, c = stack[-1]
+        options = [
+            (r + dr, c + dc, r + dr // 2, c + dc // 2)
+            for dr, dc in [(-2, 0), (2, 0), (0, -2), (0, 2)]
+            if 0 < r + dr < side - 1
+            and 0 < c + dc < side - 1
+            and grid[r + dr][c + dc] == "#"
+        ]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc, wr, wc = rng.choice(options)
+        grid[wr][wc] = grid[nr][nc] = "."
+        stack.append((nr, nc))
+
+    for r in range(1, side - 1):
+        for c in range(1, side - 1):
+            if grid[r][c] == "#" and (r + c) % 2 == 1 and rng.random() < loops:
+                grid[r][c] = "."
+    return grid
+
+
+def day01(rng: random.Random, scale: int) -> Generated:
+    rows = 1000 * scale
+    left = [rng.randrange(10000, 100000) for _ in range(rows)]
+    right = [
+        rng.choice(left) if rng.random() < 0.3 else rng.randrange(10000, 100000)
+        for _ in range(rows)
+    ]
+    return "".join(f"{a}   {b}\n" for a, b in zip(left, right)), {}
+
+
+def day02(rng: random.Random, scale: int) -> Generated:
+    lines = []
+    for _ in range(1000 * scale):
+        step = 1 if rng.random() < 0.5 else -1
+        levels = [rng.randrange(1, 100)]
+        for _ in range(rng.randrange(4, 8)):
+            levels.append(levels[-1] + step * rng.randrange(1, 4))
+        if rng.random() < 0.5:
+            levels[rng.randrange(len(levels))] += rng.randrange(-4, 5)
+        lines.append(" ".join(map(str, levels)))
+    return "\n".join(lines) + "\n", {}
+
+
+def day03(rng: random.Random, scale: int) -> Generated:
+    junk = string.ascii_letters + string.digits + "!@#$%^&*()[]{}<>,;:'?/+- "
+    tokens = [
+        lambda: f"mul({rng.randrange(1, 1000)},{rng.randrange(1, 1000)})",
+        lambda: f"mul({rng.randrange(1, 1000)}, {rng.randrange(1, 1000)})",
+        lambda: f"mul[{rng.randrange(1, 1000)},{rng.randrange(1, 1000)}]",
+        lambda: f"{rng.choice(['who', 'how', 'sel'])}({rng.randrange(1, 99)},3)",
+        lambda: "do()",
+        lambda: "don't()",
+    ]
+    lines = []
+    for _ in range(6 * scale):
+        line = []
+        length = 0
+        while length < 3000:
+            piece = (
+                rng.choice(tokens)()
+                if rng.random() < 0.3
+                else "".join(rng.choices(junk, k=rng.randrange(1, 8)))
+            )
+            line.append(piece)
+            length += len(piece)
+        lines.append("".join(line))
+    return "\n".join(lines) + "\n", {}
+
+
+def day04(rng: random.Random, scale: int) -> Generated:
+    side = _side(140, scale)
+    return _grid_text([rng.choices("XMAS", k=side) for _ in range(side)]), {}
+
+
+def day05(rng: random.Random, scale: int) -> Generated:
+    root = max(1, isqrt(scale))
+    pages = rng.sample(range(10, 10 + 90 * root), 49 * root)
+    rules = [
+        f"{pages[i]}|{pages[j]}"
+        for i in range(len(pages))
+        for j in range(i + 1, len(pages))
+    ]
+    rng.shuffle(rules)
+
+    updates = []
+    for _ in range(200 * scale):
+        length = min(len(pages), rng.randrange(5, 24, 2) * root)
+        update = rng.sample(pages, length)
+        if rng.random() < 0.5:
+            update.sort(key=pages.index)
+        updates.append(",".join(map(str, update)))
+    return "\n".join(rules) + "\n\n" + "\n".join(updates) + "\n", {}
+
+
+def _guard_exits(grid: list[list[str]], r: int, c: int) -> bool:
+    """Walk the day06 guard up from (r, c) and say whether it leaves the map."""
+    side = len(grid)
+    dr, dc = -1, 0
+    seen = set()
+    while (r, c, dr, dc) not in seen:
+        seen.add((r, c, dr, dc))
+        nr, nc = r + dr, c + dc
+        if not (0 <= nr < side and 0 <= nc < side):
+            return True
+        if grid[nr][nc] == "#":
+            dr, dc = dc, -dr
+        else:
+            r, c = nr, nc
+    return False
+
+
+def day06(rng: random.Random, scale: int) -> Generated:
+    """Regenerate until the guard's unmodified walk leaves the map (part 1)."""
+    side = _side(130, scale)
+    while True:
+        grid = [
+            ["#" if rng.random() < 0.05 else "." for _ in range(side)]
+            for _ in range(side)
+        ]
+        grid[side // 2][side // 2] = "^"
+        if _guard_exits(grid, side // 2, side // 2):
+            return _grid_text(grid), {}
+
+
+def day07(rng: random.Random, scale: int) -> Generated:
+    lines = []
+    for _ in range(850 * scale):
+        nums = [
+            rng.randrange(1, 10) if rng.random() < 0.7 else rng.randrange(10, 1000)
+            for _ in range(rng.randrange(2, 13))
+        ]
+        target = nums[0]
+        for num in nums[1:]:
+            op = rng.randrange(3)
+            if op == 0:
+                target += num
+            elif op == 1:
+                target *= num
+            else:
+                target = int(f"{target}{num}")
+        if rng.random() < 0.3:
+            target += rng.randrange(1, 100)
+        lines.append(f"{target}: {' '.join(map(str, nums))}")
+    return "\n".join(lines) + "\n", {}
+
+
+def day08(rng: random.Random, scale: int) -> Generated:
+    side = _side(50, scale)
+    frequencies = string.ascii_letters + string.digits
+    grid = [["."] * side for _ in range(side)]
+    for _ in range(200 * scale):
+        grid[rng.randrange(side)][rng.randrange(side)] = rng.choice(frequencies)
+    return _grid_text(grid), {}
+
+
+def day09(rng: random.Random, scale: int) -> Generated:
+    length = 20000 * scale - 1
+    digits = [
+        str(rng.randrange(1, 10) if i % 2 == 0 else rng.randrange(0, 10))
+        for i in range(length)
+    ]
+    return "".join(digits) + "\n", {}
+
+
+def day10(rng: random.Random, scale: int) -> Generated:
+    """Hills: the height drops by one per step away from the nearest peak."""
+    side = _side(45, scale)
+    distance: dict[tuple[int, int], int] = {}
+    queue = []
+    for _ in range(side * side // 60 + 1):
+        peak = (rng.randrange(side), rng.randrange(side))
+        distance[peak] = 0
+        queue.append(peak)
+    for r, c in queue:
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nxt = (r + dr, c + dc)
+            if 0 <= nxt[0] < side and 0 <= nxt[1] < side and nxt not in distance:
+                distance[nxt] = distance[(r, c)] + 1
+                queue.append(nxt)
+
+    grid = [
+        [
+            str(rng.randrange(10))
+            if rng.random() < 0.1
+            else str(max(0, 9 - distance[(r, c)]))
+            for c in range(side)
+        ]
+        for r in range(side)
+    ]
+    return _grid_text(grid), {}
+
+
+def day11(rng: random.Random, scale: int) -> Generated:
+    stones = [rng.randrange(0, 10**7) for _ in range(8 * scale)]
+    return " ".join(map(str, stones)) + "\n", {}
+
+
+def day12(rng: random.Random, scale: int) -> Generated:
+    side = _side(140, scale)
+    grid: list[list[str]] = []
+    for r in range(side):
+        row: list[str] = []
+        for c in range(side):
+            neighbors = ([row[c - 1]] if c else []) + ([grid[r - 1][c]] if r else [])
+            if neighbors and rng.random() < 0.85:
+                row.append(rng.choice(neighbors))
+            else:
+                row.append(rng.choice(string.ascii_uppercase))
+        grid.append(row)
+    return _grid_text(grid), {}
+
+
+def day13(rng: random.Random, scale: int) -> Generated:
+    machines = []
+    for _ in range(320 * scale):
+        ax, ay, bx, by = (rng.randrange(10, 100) for _ in range(4))
+        while ax * by == ay * bx:
+            bx, by = rng.randrange(10, 100), rng.randrange(10, 100)
+        a, b = rng.randrange(1, 100), rng.randrange(1, 100)
+        px, py = a * ax + b * bx, a * ay + b * by
+        if rng.random() < 0.5:
+            px += rng.randrange(1, 100)
+        machines.append(
+            f"Button A: X+{ax}, Y+{ay}\n"
+            f"Button B: X+{bx}, Y+{by}\n"
+            f"Prize: X={px}, Y={py}\n"
+        )
+    return "\n".join(machines), {}
+
+
+def day14(rng: random.Random, scale: int) -> Generated:
+    """
+    Most robots are placed so that after a random number of seconds they fill
+    a square, which part 2 looks for.
+    """
+    max_x, max_y = _side(101, scale), _side(103, scale)
+    robots = 500 * scale
+    picture = robots * 6 // 10
+    width = isqrt(picture) + 1
+    left, top = rng.randrange(max_x - width), rng.randrange(max_y - width)
+    seconds = rng.randrange(1000, min(100000, max_x * max_y))
+
+    lines = []
+    for i in range(robots):
+        vx, vy = rng.randrange(-max_x + 1, max_x), rng.randrange(-max_y + 1, max_y)
+        if i < picture:
+            x = (left + i % width - vx * seconds) % max_x
+            y = (top + i // width - vy * seconds) % max_y
+        else:
+            x, y = rng.randrange(max_x), rng.randrange(max_y)
+        lines.append(f"p={x},{y} v={vx},{vy}")
+    rng.shuffle(lines)
+    return "\n".join(lines) + "\n", {"max_x": max_x, "max_y": max_y}
+
+
+def day15(rng: random.Random, scale: int) -> Generated:
+    side = _side(50, scale)
+    grid = [["#"] * side for _ in range(side)]
+    for r in range(1, side - 1):
+        for c in range(1, side - 1):
+            roll = rng.random()
+            grid[r][c] = "O" if roll < 0.25 else "#" if roll < 0.3 else "."
+    grid[rng.randrange(1, side - 1)][rng.randrange(1, side - 1)] = "@"
+
+    moves = "".join(rng.choices("^v<>", k=20000 * scale))
+    move_lines = "\n".join(moves[i : i + 1000] for i in range(0, len(moves), 1000))
+    return _grid_text(grid) + "\n" + move_lines + "\n", {}
+
+
+def day16(rng: random.Random, scale: int) -> Generated:
+    grid = _maze(rng, _side(141, scale), loops=0.02)
+    side = len(grid)
+    grid[side - 2][1] = "S"
+    grid[1][side - 2] = "E"
+    return _grid_text(grid), {}
+
+
+# Programs find_a can invert: they shift A by 3 bits per output.
+DAY17_PROGRAMS = [
+    [2, 4, 1, 1, 7, 5, 1, 5, 4, 0, 5, 5, 0, 3, 3, 0],
+    [2, 4, 1, 2, 7, 5, 1, 3, 4, 0, 5, 5, 0, 3, 3, 0],
+    [2, 4, 1, 0, 7, 5, 4, 0, 1, 7, 5, 5, 0, 3, 3, 0],
+    [2, 4, 1, 3, 7, 5, 0, 3, 4, 0, 1, 5, 5, 5, 3, 0],
+    [2, 4, 1, 5, 7, 5, 1, 6, 0, 3, 4, 0, 5, 5, 3, 0],
+]
+
+
+def day17(rng: random.Random, scale: int) -> Generated:
+    program = rng.choice(DAY17_PROGRAMS)
+    reg_a = rng.getrandbits(48 * scale)
+    text = (
+        f"Register A: {reg_a}\nRegister B: 0\nRegister C: 0\n\n"
+        f"Program: {','.join(map(str, program))}\n"
+    )
+    return text, {}
+
+
+def day18(rng: random.Random, scale: int) -> Generated:
+    side = _side(71, scale)
+    cells = [
+        (x, y)
+        for x in range(side)
+        for y in range(side)
+        if (x, y) not in [(0, 0), (side - 1, side - 1)]
+    ]
+    rng.shuffle(cells)
+    text = "".join(f"{x},{y}\n" for x, y in cells[: len(cells) * 7 // 10])
+    return text, {"maxx": side, "maxy": side, "bytes_fallen": side * side // 5}
+
+
+def day19(rng: random.Random, scale: int) -> Generated:
+    # One letter only ever appears in towels followed by a partner letter, so
+    # designs that use it any other way are impossible.
+    missing, partner = rng.sample("wubrg", 2)
+    towels = {
+        "".join(rng.choices("wubrg", k=rng.randrange(1, 9))) for _ in range(600)
+    }
+    towels = sorted(
+        t for t in towels if t.replace(missing + partner, "").count(missing) == 0
+    )[:447]
+
+    designs = []
+    for _ in range(400 * scale):
+        length = rng.randrange(20, 61)
+        if rng.random() < 0.5:
+            design = ""
+            while len(design) < length:
+                design += rng.choice(towels)
+        else:
+            design = "".join(rng.choices("wubrg", k=length))
+        designs.append(design)
+    return ", ".join(towels) + "\n\n" + "\n".join(designs) + "\n", {}
+
+
+def day20(rng: random.Random, scale: int) -> Generated:
+    grid = _maze(rng, _side(141, scale))
+    side = len(grid)
+
+    # Keep only the single track from S to E, as the puzzle's racetrack has
+    # no branches.
+    start = (1, 1)
+    parents: dict[tuple[int, int], Optional[tuple[int, int]]] = {start: None}
+    queue = [start]
+    for r, c in queue:
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nxt = (r + dr, c + dc)
+            if grid[nxt[0]][nxt[1]] == "." and nxt not in parents:
+                parents[nxt] = (r, c)
+                queue.append(nxt)
+    end = queue[-1]
+
+    track = [["#"] * side for _ in range(side)]
+    node: Optional[tuple[int, int]] = end
+    while node is not None:
+        track[node[0]][node[1]] = "."
+        node = parents[node]
+    track[start[0]][start[1]] = "S"
+    track[end[0]][end[1]] = "E"
+    return _grid_text(track), {}
+
+
+def day21(rng: random.Random, scale: int) -> Generated:
+    codes = [f"{rng.randrange(1, 1000):03d}A" for _ in range(5 * scale)]
+    return "\n".join(codes) + "\n", {}
+
+
+def day22(rng: random.Random, scale: int) -> Generated:
+    secrets = [rng.randrange(1, 16777216) for _ in range(2000 * scale)]
+    return "\n".join(map(str, secrets)) + "\n", {}
+
+
+def day23(rng: random.Random, scale: int) -> Generated:
+    count = 520 * scale
+    width = 2
+    while 26**width < count:
+        width += 1
+    names: set[str] = set()
+    while len(names) < count:
+        names.add("".join(rng.choices(string.ascii_lowercase, k=width)))
+    nodes = sorted(names)
+
+    edges: set[tuple[str, str]] = set()
+    for node in nodes:
+        for other in rng.sample(nodes, 6):
+            if other != node:
+                edges.add((min(node, other), max(node, other)))
+    clique = rng.sample(nodes, 13)
+    for i, a in enumerate(clique):
+        for b in clique[i + 1 :]:
+            edges.add((min(a, b), max(a, b)))
+
+    lines = [f"{a}-{b}" for a, b in edges]
+    rng.shuffle(lines)
+    return "\n".join(lines) + "\n", {}
+
+
+def day24(rng: random.Random, scale: int) -> Generated:
+    """A ripple carry adder over 45 * scale bit inputs."""
+    bits = 45 * scale
+    width = max(2, len(str(bits)))
+    names: set[str] = set()
+
+    def wire() -> str:
+        while True:
+            name = "".join(rng.choices(string.ascii_lowercase[:23], k=3))
+            if name not in names:
+                names.add(name)
+                return name
+
+    def w(prefix: str, i: int) -> str:
+        return f"{prefix}{i:0{width}d}"
+
+    inputs = [f"{w(p, i)}: {rng.randrange(2)}" for p in "xy" for i in range(bits)]
+    gates = [
+        f"{w('x', 0)} XOR {w('y', 0)} -> {w('z', 0)}",
+    ]
+    carry = wire()
+    gates.append(f"{w('x', 0)} AND {w('y', 0)} -> {carry}")
+    for i in range(1, bits):
+        half, both, through = wire(), wire(), wire()
+        out_carry = w("z", bits) if i == bits - 1 else wire()
+        gates += [
+            f"{w('x', i)} XOR {w('y', i)} -> {half}",
+            f"{half} XOR {carry} -> {w('z', i)}",
+            f"{w('x', i)} AND {w('y', i)} -> {both}",
+            f"{half} AND {carry} -> {through}",
+            f"{both} OR {through} -> {out_carry}",
+        ]
+        carry = out_carry
+    rng.shuffle(gates)
+    return "\n".join(inputs) + "\n\n" + "\n".join(gates) + "\n", {}
+
+
+def day25(rng: random.Random, scale: int) -> Generated:
+    schematics = []
+    for i in range(500 * scale):
+        heights = [rng.randrange(6) for _ in range(5)]
+        rows = [
+            "".join("#" if h >= level else "." for h in heights) for level in range(1, 6)
+        ]
+        if i % 2 == 0:
+            grid = ["#####"] + rows + ["....."]
+        else:
+            grid = ["....."] + rows[::-1] + ["#####"]
+        schematics.append("\n".join(grid))
+    return "\n\n".join(schematics) + "\n", {}
+
+
+GENERATORS: dict[int, Callable[[random.Random, int], Generated]] = {
+    int(name[3:]): fn for name, fn in list(globals().items()) if name.startswith("day")
+}
+
+
+def generate(day: int, scale: int = 1, seed: int = 2024) -> Generated:
+    """
+    Return a valid input for day, scale times the size of the puzzle input,
+    along with the part options it needs. The same seed always gives the same
+    input.
+    """
+    return GENERATORS[day](random.Random(seed * 100 + day), scale)
+
+
+def write_inputs(
+    out_dir: str, days: Sequence[int], scale: int = 1, seed: int = 2024
+) -> None:
+    """
+    Write dayNN.txt for each day to out_dir, and the part options the runner
+    needs to options.json, keeping the options already there for other days.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, "options.json")
+    options = {}
+    if os.path.exists(path):
+        with open(path) as file:
+            options = json.load(file)
+    for day in days:
+        text, day_options = generate(day, scale, seed)
+        with open(os.path.join(out_dir, f"day{day:02d}.txt"), "w") as file:
+            file.write(text)
+        if day_options:
+            options[str(day)] = day_options
+        else:
+            options.pop(str(day), None)
+    with open(path, "w") as file:
+        json.dump(options, file, indent=2)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", "-o", help="output directory", required=True, type=str)
+    parser.add_argument("--scale", "-s", help="size multiplier", default=1, type=int)
+    parser.add_argument("--seed", help="random seed", default=2024, type=int)
+    parser.add_argument(
+        "--days", "-d", help="days to generate (default all)", nargs="*", type=int
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Generate synthetic inputs, e.g. python generators.py -o inputs/x10 -s 10
+    """
+    args = parse_args(argv)
+    write_inputs(args.out, args.days or sorted(GENERATORS), args.scale, args.seed)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,197 @@
+import heapq
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+
+# Distance given to nodes a search never reaches.
+UNREACHABLE = -1
+
+
+@dataclass(frozen=True)
+class CSRGraph:
+    """
+    A graph over the integer nodes 0..num_nodes-1 in compressed sparse row
+    form: the neighbors of node n are indices[indptr[n]:indptr[n + 1]], with
+    matching edge weights when the graph is weighted.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: Optional[np.ndarray] = None
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    def neighbors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+
+def from_edges(
+    num_nodes: int,
+    sources: Union[np.ndarray, Sequence[int]],
+    targets: Union[np.ndarray, Sequence[int]],
+    weights: Optional[Union[np.ndarray, Sequence[float]]] = None,
+    directed: bool = False,
+) -> CSRGraph:
+    """
+    Build a CSR graph from parallel arrays of edge endpoints. Undirected edges
+    are stored in both directions.
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    weight_array = None if weights is None else np.asarray(weights, dtype=np.float64)
+    if not directed:
+        sources, targets = (
+            np.concatenate([sources, targets]),
+            np.concatenate([targets, sources]),
+        )
+        if weight_array is not None:
+            weight_array = np.concatenate([weight_array, weight_array])
+
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+    return CSRGraph(
+        indptr,
+        targets[order],
+        None if weight_array is None else weight_array[order],
+    )
+
+
+def from_grid(passable: np.ndarray, regions: Optional[np.ndarray] = None) -> CSRGraph:
+    """
+    Build the graph of a 2D grid where node r * cols + c is cell (r, c) and
+    orthogonally adjacent passable cells are joined. With regions, cells are
+    only joined when their region values match too.
+    """
+    rows, cols = passable.shape
+    index = np.arange(rows * cols, dtype=np.int64).reshape(rows, cols)
+    sources, targets = [], []
+    for a, b in [
+        (np.s_[:, :-1], np.s_[:, 1:]),  # right
+        (np.s_[:-1, :], np.s_[1:, :]),  # down
+    ]:
+        joined = passable[a] & passable[b]
+        if regions is not None:
+            joined &= regions[a] == regions[b]
+        sources.append(index[a][joined])
+        targets.append(index[b][joined])
+    return from_edges(rows * cols, np.concatenate(sources), np.concatenate(targets))
+
+
+def _expand(graph: CSRGraph, frontier: np.ndarray) -> np.ndarray:
+    """Return the concatenated neighbors of every node in frontier."""
+    starts = graph.indptr[frontier]
+    counts = graph.indptr[frontier + 1] - starts
+    total = counts.sum()
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return graph.indices[offsets + np.arange(total)]
+
+
+def multi_source_bfs(
+    graph: CSRGraph, sources: Union[np.ndarray, Sequence[int]]
+) -> np.ndarray:
+    """
+    Unweighted distances from the nearest of sources to every node, with
+    UNREACHABLE for nodes no source reaches. Each level is expanded with
+    array operations rather than node by node.
+    """
+    distances = np.full(graph.num_nodes, UNREACHABLE, dtype=np.int64)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    distances[frontier] = 0
+    level = 0
+    while len(frontier):
+        level += 1
+        reached = _expand(graph, frontier)
+        frontier = np.unique(reached[distances[reached] == UNREACHABLE])
+        distances[frontier] = level
+    return distances
+
+
+def bfs(graph: CSRGraph, source: int) -> np.ndarray:
+    """Unweighted distances from source, UNREACHABLE where there is no path."""
+    return multi_source_bfs(graph, [source])
+
+
+def dijkstra(graph: CSRGraph, source: int) -> np.ndarray:
+    """
+    Weighted distances from source (all weights 1 when the graph has none),
+    with inf for nodes that cannot be reached.
+    """
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    weights = (
+        [1.0] * len(indices) if graph.weights is None else graph.weights.tolist()
+    )
+    distances = [float("inf")] * graph.num_nodes
+    distances[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        dist, node = heapq.heappop(heap)
+        if dist > distances[node]:
+            continue
+        for i in range(indptr[node], indptr[node + 1]):
+            new_dist = dist + weights[i]
+            if new_dist < distances[indices[i]]:
+                distances[indices[i]] = new_dist
+                heapq.heappush(heap, (new_dist, indices[i]))
+    return np.array(distances, dtype=np.float64)
+
+
+def connected_components(graph: CSRGraph) -> np.ndarray:
+    """
+    Label every node with the smallest node id in its component. Labels are
+    hooked along edges to the smaller root and then compressed by pointer
+    jumping until nothing changes.
+    """
+    labels = np.arange(graph.num_nodes, dtype=np.int64)
+    sources = np.repeat(labels, graph.degree())
+    targets = graph.indices
+    while True:
+        smaller = np.minimum(labels[sources], labels[targets])
+        hooked = labels.copy()
+        np.minimum.at(hooked, labels[sources], smaller)
+        np.minimum.at(hooked, labels[targets], smaller)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
+
+
+def all_shortest_paths(graph: CSRGraph, source: int, target: int) -> list[list[int]]:
+    """
+    Every unweighted shortest path from source to target as lists of nodes,
+    found by walking from source to neighbors one step closer to target.
+    """
+    to_target = bfs(graph, target)
+    if to_target[source] == UNREACHABLE:
+        return []
+
+    paths = []
+    stack = [[source]]
+    while stack:
+        path = stack.pop()
+        node = path[-1]
+        if node == target:
+            paths.append(path)
+            continue
+        for neighbor in graph.neighbors(node).tolist():
+            if to_target[neighbor] == to_target[node] - 1:
+                stack.append(path + [neighbor])
+    return paths
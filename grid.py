@@ -0,0 +1,129 @@
+from __future__ import annotations
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# (row, col) steps to the four orthogonal and the eight surrounding cells.
+ORTHOGONAL = ((-1, 0), (1, 0), (0, -1), (0, 1))
+SURROUNDING = tuple(
+    (dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)
+)
+
+
+class Grid:
+    """
+    A rectangular grid of one byte cells stored row major in a single
+    bytearray, so a cell costs one byte rather than a list slot and a str.
+    Cells are addressed by (row, col) or by flat index row * cols + col.
+    """
+
+    __slots__ = ("rows", "cols", "cells")
+
+    def __init__(self, rows: int, cols: int, cells: bytearray) -> None:
+        if len(cells) != rows * cols:
+            raise ValueError(f"{len(cells)} cells do not fill {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], digits: bool = False) -> Grid:
+        """
+        Build a grid from lines of text, ignoring surrounding whitespace and
+        blank lines. With digits, "0"-"9" are stored as the values 0-9.
+        """
+        rows = [line.strip() for line in lines]
+        rows = [row for row in rows if row]
+        cols = len(rows[0]) if rows else 0
+        for row in rows:
+            if len(row) != cols:
+                raise ValueError("Grid rows must all be the same length")
+        cells = bytearray("".join(rows).encode("latin-1"))
+        if digits:
+            cells = bytearray(b - 48 for b in cells)
+        return cls(len(rows), cols, cells)
+
+    @classmethod
+    def from_file(cls, file_path: str, digits: bool = False) -> Grid:
+        with open(file_path, "r") as file:
+            return cls.from_lines(file, digits)
+
+    def __getitem__(self, position: tuple[int, int]) -> str:
+        r, c = position
+        return chr(self.cells[r * self.cols + c])
+
+    def __setitem__(self, position: tuple[int, int], value: str) -> None:
+        r, c = position
+        self.cells[r * self.cols + c] = ord(value)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Grid)
+            and (self.rows, self.cols) == (other.rows, other.cols)
+            and self.cells == other.cells
+        )
+
+    def __repr__(self) -> str:
+        return f"Grid({self.rows}x{self.cols})"
+
+    def __str__(self) -> str:
+        return "\n".join(bytes(self.row(r)).decode("latin-1") for r in range(self.rows))
+
+    def value(self, r: int, c: int) -> int:
+        """Return the raw byte at (r, c), e.g. the height in a digits grid."""
+        return self.cells[r * self.cols + c]
+
+    def in_bounds(self, r: int, c: int) -> bool:
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def index(self, r: int, c: int) -> int:
+        return r * self.cols + c
+
+    def position(self, index: int) -> tuple[int, int]:
+        return divmod(index, self.cols)
+
+    def row(self, r: int) -> memoryview:
+        """A zero copy, writable view of row r."""
+        return memoryview(self.cells)[r * self.cols : (r + 1) * self.cols]
+
+    def copy(self) -> Grid:
+        return Grid(self.rows, self.cols, bytearray(self.cells))
+
+    def find(self, char: Union[str, int]) -> Optional[tuple[int, int]]:
+        """Return the position of the first char (or raw byte value), or None."""
+        index = self.cells.find(char if isinstance(char, int) else ord(char))
+        return None if index == -1 else self.position(index)
+
+    def find_all(self, char: Union[str, int]) -> list[tuple[int, int]]:
+        """
+        Return the positions of every char (or raw byte value), in row major
+        order.
+        """
+        positions = []
+        byte = char if isinstance(char, int) else ord(char)
+        index = self.cells.find(byte)
+        while index != -1:
+            positions.append(self.position(index))
+            index = self.cells.find(byte, index + 1)
+        return positions
+
+    def offsets(self, steps: Iterable[tuple[int, int]] = ORTHOGONAL) -> list[int]:
+        """Flat index offsets of (row, col) steps, e.g. up is -cols."""
+        return [dr * self.cols + dc for dr, dc in steps]
+
+    def neighbors(
+        self, r: int, c: int, steps: Iterable[tuple[int, int]] = ORTHOGONAL
+    ) -> Iterator[tuple[int, int]]:
+        """Yield the in bounds positions one step away from (r, c)."""
+        for dr, dc in steps:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                yield nr, nc
+
+    def array(self) -> np.ndarray:
+        """A zero copy (rows, cols) uint8 NumPy view of the cells."""
+        import numpy as np
+
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.rows, self.cols)
@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+# Scales the median absolute deviation to estimate a standard deviation.
+MAD_TO_SIGMA = 1.4826
+
+
+@dataclass
+class HistoryRecord:
+    """One measured trial of one phase of one day, as stored in the history."""
+
+    revision: str
+    timestamp: float
+    label: str
+    trial: int
+    day: int
+    phase: str
+    wall: float
+    cpu: float
+    peak_memory: Optional[int]
+    max_rss: Optional[int]
+    error: Optional[str] = None
+
+
+def git_revision(path: Optional[str] = None) -> str:
+    """
+    The short hash of HEAD, with "+dirty" when the working tree has changes,
+    or "unknown" outside a git checkout.
+    """
+    cwd = path or os.path.dirname(os.path.abspath(__file__))
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}+dirty" if dirty else revision
+
+
+def append(path: str, records: Iterable[HistoryRecord]) -> None:
+    """Append records to the JSON lines history at path."""
+    with open(path, "a") as file:
+        for record in records:
+            file.write(json.dumps(asdict(record)) + "\n")
+
+
+def load(path: str) -> list[HistoryRecord]:
+    with open(path, "r") as file:
+        return [HistoryRecord(**json.loads(line)) for line in file if line.strip()]
+
+
+@dataclass
+class Summary:
+    """The median and noise of one metric over a revision's trials."""
+
+    median: float
+    noise: float
+    trials: int
+
+
+def summarize(values: Sequence[float]) -> Summary:
+    """Median, with the scaled median absolute deviation as the noise."""
+    median = statistics.median(values)
+    mad = statistics.median([abs(v - median) for v in values])
+    return Summary(median, MAD_TO_SIGMA * mad, len(values))
+
+
+@dataclass
+class Comparison:
+    label: str
+    day: int
+    phase: str
+    metric: str
+    baseline: Summary
+    candidate: Summary
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        if self.baseline.median == 0:
+            return 0.0
+        return self.candidate.median / self.baseline.median - 1
+
+
+def compare(
+    records: Sequence[HistoryRecord],
+    baseline: str,
+    candidate: str,
+    threshold: float = 0.1,
+    sigmas: float = 2.0,
+    min_seconds: float = 0.001,
+) -> list[Comparison]:
+    """
+    Compare each (label, day, phase) measured at both revisions. Time has
+    regressed when the candidate's median is more than threshold slower, by
+    more than sigmas times the larger noise and at least min_seconds. Peak
+    memory has regressed when its median grows by more than threshold.
+    """
+    groups: dict[tuple[str, int, str, str], list[HistoryRecord]] = defaultdict(list)
+    for record in records:
+        if record.error is None and record.revision in (baseline, candidate):
+            groups[(record.label, record.day, record.phase, record.revision)].append(
+                record
+            )
+
+    comparisons = []
+    keys = sorted({key[:3] for key in groups})
+    for label, day, phase in keys:
+        before = groups.get((label, day, phase, baseline))
+        after = groups.get((label, day, phase, candidate))
+        if not before or not after:
+            continue
+
+        base, cand = summarize([r.wall for r in before]), summarize(
+            [r.wall for r in after]
+        )
+        slower = cand.median - base.median
+        regressed = (
+            cand.median > base.median * (1 + threshold)
+            and slower > sigmas * max(base.noise, cand.noise)
+            and slower >= min_seconds
+        )
+        comparisons.append(Comparison(label, day, phase, "wall", base, cand, regressed))
+
+        for metric in ("peak_memory", "max_rss"):
+            before_values = [getattr(r, metric) for r in before]
+            after_values = [getattr(r, metric) for r in after]
+            if None in before_values or None in after_values:
+                continue
+            base, cand = summarize(before_values), summarize(after_values)
+            regressed = cand.median > base.median * (1 + threshold)
+            comparisons.append(
+                Comparison(label, day, phase, metric, base, cand, regressed)
+            )
+    return comparisons
+
+
+def format_comparisons(comparisons: Sequence[Comparison], only_regressions: bool) -> str:
+    """Render the comparisons as a fixed width table."""
+    lines = [
+        f"{'label':<12}  {'day':>3}  {'phase':<6}  {'metric':<11}  "
+        f"{'baseline':>18}  {'candidate':>18}  {'change':>8}"
+    ]
+    for c in comparisons:
+        if only_regressions and not c.regressed:
+            continue
+        base = f"{c.baseline.median:.4g}±{c.baseline.noise:.2g}"
+        cand = f"{c.candidate.median:.4g}±{c.candidate.noise:.2g}"
+        flag = "  REGRESSED" if c.regressed else ""
+        lines.append(
+            f"{c.label:<12}  {c.day:>3}  {c.phase:<6}  {c.metric:<11}  "
+            f"{base:>18}  {cand:>18}  {c.change:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def latest_revision(records: Sequence[HistoryRecord]) -> Optional[str]:
+    return max(records, key=lambda r: r.timestamp).revision if records else None
+
+
+def format_revisions(records: Sequence[HistoryRecord]) -> str:
+    """List each revision in the history with when it was last run."""
+    last: dict[str, float] = {}
+    labels: dict[str, set[str]] = defaultdict(set)
+    for record in records:
+        last[record.revision] = max(last.get(record.revision, 0.0), record.timestamp)
+        labels[record.revision].add(record.label)
+    lines = []
+    for revision, timestamp in sorted(last.items(), key=lambda item: item[1]):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+        lines.append(f"{revision:<16}  {when}  {', '.join(sorted(labels[revision]))}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--history", help="JSON lines history file", default="bench_history.jsonl"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the revisions in the history")
+    comparing = commands.add_parser(
+        "compare", help="flag regressions of a revision against a baseline"
+    )
+    comparing.add_argument("--baseline", "-b", required=True, help="baseline revision")
+    comparing.add_argument(
+        "--candidate", "-c", help="revision to check (default the latest run)"
+    )
+    comparing.add_argument(
+        "--threshold",
+        "-t",
+        type=float,
+        default=0.1,
+        help="relative slowdown or memory growth that counts as a regression",
+    )
+    comparing.add_argument(
+        "--sigmas",
+        type=float,
+        default=2.0,
+        help="slowdowns within this many noise estimates are ignored",
+    )
+    comparing.add_argument(
+        "--all", action="store_true", help="show every comparison, not only regressions"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Inspect the benchmark history that runner.py --history appends to, e.g.
+    python history.py compare -b 3aa7b0a -c 659077d
+    """
+    args = parse_args(argv)
+    records = load(args.history)
+    if args.command == "list":
+        print(format_revisions(records))
+        return
+
+    candidate = args.candidate or latest_revision(records)
+    if candidate is None:
+        sys.exit(f"{args.history} is empty")
+    comparisons = compare(records, args.baseline, candidate, args.threshold, args.sigmas)
+    if not comparisons:
+        sys.exit(f"No day was measured at both {args.baseline} and {candidate}")
+    print(format_comparisons(comparisons, not args.all))
+    regressions = sum(c.regressed for c in comparisons)
+    print(f"{regressions} regression(s) of {candidate} against {args.baseline}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
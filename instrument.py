@@ -0,0 +1,152 @@
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any, Optional, TextIO
+
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls", "time")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """
+    Add the instrumentation flags shared by every day's command line:
+    --profile, --trace-memory and --timing. Returns the parser.
+    """
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="profile each phase with cProfile, printing the top functions, or "
+        "writing FILE with the phase name before its suffix (e.g. "
+        "day16.part1.prof) for snakeviz or pstats",
+    )
+    group.add_argument(
+        "--profile-sort",
+        choices=PROFILE_SORT_KEYS,
+        default="cumulative",
+        help="order of the printed profile",
+    )
+    group.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="report each phase's peak traced memory and the allocation sites "
+        "still live at its end",
+    )
+    group.add_argument(
+        "--timing",
+        action="store_true",
+        help="report each phase's wall and CPU time",
+    )
+    group.add_argument(
+        "--top",
+        type=int,
+        default=15,
+        help="how many functions or allocation sites to report per phase",
+    )
+    return parser
+
+
+def profile_path(path: str, phase: str) -> str:
+    """Insert the phase before the suffix of path: out.prof -> out.part1.prof."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{phase}{ext or '.prof'}"
+
+
+class Instruments:
+    """
+    Runs the phases of a day (parse, part1, part2, ...) under whichever of
+    cProfile, tracemalloc and timers were asked for, reporting to stream
+    (stderr by default) so the answers on stdout are unchanged.
+    """
+
+    def __init__(
+        self,
+        profile: Optional[str] = None,
+        profile_sort: str = "cumulative",
+        trace_memory: bool = False,
+        timing: bool = False,
+        top: int = 15,
+        stream: Optional[TextIO] = None,
+    ) -> None:
+        self.profile = profile
+        self.profile_sort = profile_sort
+        self.trace_memory = trace_memory
+        self.timing = timing
+        self.top = top
+        self.stream = stream
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "Instruments":
+        return cls(
+            profile=getattr(args, "profile", None),
+            profile_sort=getattr(args, "profile_sort", "cumulative"),
+            trace_memory=getattr(args, "trace_memory", False),
+            timing=getattr(args, "timing", False),
+            top=getattr(args, "top", 15),
+        )
+
+    def _write(self, text: str) -> None:
+        print(text, file=self.stream or sys.stderr)
+
+    def run(self, phase: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Call fn(*args, **kwargs) as the named phase and return its result."""
+        profiler = cProfile.Profile() if self.profile is not None else None
+        if self.trace_memory:
+            tracemalloc.start()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            if self.trace_memory:
+                self._report_memory(phase)
+            if profiler is not None:
+                self._report_profile(phase, profiler)
+            if self.timing:
+                self._write(f"[timing] {phase}: {wall:.4f}s wall, {cpu:.4f}s cpu")
+
+    def _report_memory(self, phase: str) -> None:
+        # The snapshot is taken as the phase ends, so the sites listed hold
+        # what is still allocated then, not what made up the peak.
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        self._write(
+            f"[memory] {phase}: peak {peak / 1024:.1f} KiB; "
+            "largest allocations live at end of phase:"
+        )
+        for stat in snapshot.statistics("lineno")[: self.top]:
+            frame = stat.traceback[0]
+            self._write(
+                f"[memory]   {stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  "
+                f"{frame.filename}:{frame.lineno}"
+            )
+
+    def _report_profile(self, phase: str, profiler: cProfile.Profile) -> None:
+        if self.profile and self.profile != "-":
+            path = profile_path(self.profile, phase)
+            profiler.dump_stats(path)
+            self._write(f"[profile] {phase}: wrote {path}")
+            return
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats(self.profile_sort).print_stats(
+            self.top
+        )
+        self._write(f"[profile] {phase}")
+        self._write(out.getvalue().rstrip())
@@ -0,0 +1,82 @@
+import os
+from collections.abc import Iterator
+
+import numpy as np
+
+# The most digits an int64 is sure to hold.
+MAX_DIGITS = 18
+
+
+def find_integers(text: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse every run of ASCII digits (with an optional leading "-") in a uint8
+    array of text into an int64 array, returned with the offset each run
+    starts at. Numbers are grouped by length and the k-th digit of every
+    number in a group is folded in at once, so there is no Python work per
+    number.
+    """
+    digits = (text >= ord("0")) & (text <= ord("9"))
+    if np.any(~digits & (text > ord(" ")) & (text != ord("-"))):
+        raise ValueError("text holds more than whitespace separated integers")
+    edges = np.diff(digits.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+    if len(starts) == 0:
+        return np.empty(0, dtype=np.int64), starts
+    if lengths.max() > MAX_DIGITS:
+        raise ValueError("number too large for int64")
+
+    numbers = np.empty(len(starts), dtype=np.int64)
+    for length in np.unique(lengths).tolist():
+        group = np.flatnonzero(lengths == length)
+        group_starts = starts[group]
+        number = np.zeros(len(group), dtype=np.int64)
+        for k in range(length):
+            number *= 10
+            number += text[group_starts + k]
+        number -= ord("0") * (10**length - 1) // 9
+        numbers[group] = number
+    negative = np.zeros(len(starts), dtype=bool)
+    negative[1:] = text[starts[1:] - 1] == ord("-")
+    negative[0] = starts[0] > 0 and text[starts[0] - 1] == ord("-")
+    numbers[negative] *= -1
+    return numbers, starts
+
+
+def parse_integers(text: np.ndarray) -> np.ndarray:
+    """Parse every integer in a uint8 array of text, see find_integers."""
+    return find_integers(text)[0]
+
+
+def line_numbers(text: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """The 0-based line of text each of the sorted offsets positions is on."""
+    return np.searchsorted(np.flatnonzero(text == ord("\n")), positions)
+
+
+def count_lines(text: np.ndarray) -> int:
+    """Lines as Python's file iteration counts them: a last line needs no newline."""
+    newlines = int(np.count_nonzero(text == ord("\n")))
+    return newlines + int(len(text) > 0 and text[-1] != ord("\n"))
+
+
+def line_ranges(file_path: str, chunk_size: int) -> Iterator[tuple[int, int]]:
+    """
+    Split the file into consecutive (start, end) byte ranges of about
+    chunk_size bytes, each ending just after a newline (or at the end of the
+    file) so no line is split. Only the bytes around each cut are read.
+    """
+    size = os.path.getsize(file_path)
+    start = 0
+    with open(file_path, "rb") as file:
+        while start < size:
+            end = min(start + chunk_size, size)
+            file.seek(end)
+            while end < size:
+                block = file.read(1 << 16)
+                newline = block.find(b"\n")
+                if newline >= 0:
+                    end += newline + 1
+                    break
+                end += len(block)
+            yield start, min(end, size)
+            start = end
@@ -0,0 +1,76 @@
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def cache_dir() -> str:
+    """Where parsed inputs are stored, overridable with AOC_CACHE_DIR."""
+    return os.environ.get(
+        "AOC_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "adventofcode_2024"),
+    )
+
+
+def cache_enabled() -> bool:
+    """Set AOC_PARSE_CACHE=0 to always parse the text."""
+    return os.environ.get("AOC_PARSE_CACHE", "1") != "0"
+
+
+def file_digest(file_path: str) -> str:
+    """Return the sha256 of the file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_parse(version: int = 1) -> Callable[[Callable[[str], T]], Callable[[str], T]]:
+    """
+    Decorate a parser taking a file path so its result is pickled to disk,
+    keyed by the parser's name, its version and the hash of the file. Later
+    calls on an unchanged file load the pickle instead of parsing. Bump
+    version whenever the parser's output changes.
+    """
+
+    def decorator(parser: Callable[[str], T]) -> Callable[[str], T]:
+        @functools.wraps(parser)
+        def wrapper(file_path: str) -> T:
+            if not cache_enabled():
+                return parser(file_path)
+
+            name = f"{parser.__module__}.{parser.__qualname__}"
+            key = f"{name}-v{version}-{file_digest(file_path)}.pickle"
+            path = os.path.join(cache_dir(), key)
+            try:
+                with open(path, "rb") as file:
+                    return pickle.load(file)
+            except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+                pass
+
+            result = parser(file_path)
+            _store(path, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _store(path: str, value: Any) -> None:
+    """Write the pickle atomically so concurrent runs never see half a file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,492 @@
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from typing import Any, Optional
+
+import history
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+
+@dataclass(frozen=True)
+class DaySpec:
+    """
+    How to run a day: the module, the name of its parser, and the names of its
+    part functions.
+    """
+
+    module: str
+    parser: str
+    parts: tuple[str, ...] = field(default=("part1", "part2"))
+
+
+DAYS: dict[int, DaySpec] = {
+    1: DaySpec("day01", "load_lists"),
+    2: DaySpec("day02", "read_integer_rows"),
+    3: DaySpec("day03", "read_mem_rows"),
+    4: DaySpec("day04", "read_grid"),
+    5: DaySpec("day05", "parse_input"),
+    6: DaySpec("day06", "process_grid"),
+    7: DaySpec("day07", "process_input"),
+    8: DaySpec("day08", "process_input"),
+    9: DaySpec("day09", "parse_input", ("part2",)),
+    10: DaySpec("day10", "parse_input"),
+    11: DaySpec("day11", "parse_input"),
+    12: DaySpec("day12", "load_graph", ("part1",)),
+    13: DaySpec("day13", "parse_input_and_generate_data"),
+    14: DaySpec("day14", "parse_robots_from_file"),
+    15: DaySpec("day15", "parse_input", ("part1",)),
+    16: DaySpec("day16", "read_grid_from_file"),
+    17: DaySpec("day17", "parse_input"),
+    18: DaySpec("day18", "parse_input"),
+    19: DaySpec("day19", "parse_input"),
+    20: DaySpec("day20", "load_racetrack"),
+    21: DaySpec("day21", "parse_input"),
+    22: DaySpec("day22", "parse_input"),
+    23: DaySpec("day23", "parse_input"),
+    24: DaySpec("day24", "parse_gates_from_file", ("part1",)),
+    25: DaySpec("day25", "load_locks_and_keys", ("part1",)),
+}
+
+
+@dataclass
+class Measurement:
+    """Timing of one phase (import, parse or a part) of one day."""
+
+    day: int
+    phase: str
+    wall: float
+    cpu: float
+    peak_memory: Optional[int]
+    answer: Optional[str] = None
+    error: Optional[str] = None
+    max_rss: Optional[int] = None
+    trial: int = 0
+
+
+def max_rss() -> Optional[int]:
+    """
+    The process's peak resident set size in bytes so far, or None where the
+    resource module is unavailable.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def measure(
+    day: int, phase: str, fn: Callable, *args: Any, trace_memory: bool = True
+) -> tuple[Any, Measurement]:
+    """
+    Call fn(*args) capturing wall time, CPU time and (optionally) the peak
+    traced allocation, along with the process's peak RSS. Exceptions are
+    recorded rather than raised so a single broken day does not stop the run.
+    Returns the result and the measurement.
+    """
+    result = None
+    error = None
+    if trace_memory:
+        tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        result = fn(*args)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, Measurement(
+        day, phase, wall, cpu, peak, error=error, max_rss=max_rss()
+    )
+
+
+def input_path(input_dir: str, day: int) -> str:
+    return os.path.join(input_dir, f"day{day:02d}.txt")
+
+
+def load_options(input_dir: str) -> dict[int, dict[str, int]]:
+    """
+    Read the per-day part options (e.g. grid sizes) that generators.py writes
+    alongside scaled inputs. Returns an empty dict when there are none.
+    """
+    path = os.path.join(input_dir, "options.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as file:
+        return {int(day): options for day, options in json.load(file).items()}
+
+
+def run_day(
+    day: int,
+    file_path: str,
+    trace_memory: bool = True,
+    options: Optional[dict[str, int]] = None,
+    parts: Optional[Sequence[str]] = None,
+) -> list[Measurement]:
+    """
+    Import, parse and solve the parts of a day (all of them by default),
+    passing options to the part functions as keyword arguments. Returns the
+    measurements.
+    """
+    spec = DAYS[day]
+    module, m = measure(
+        day, "import", importlib.import_module, spec.module, trace_memory=trace_memory
+    )
+    measurements = [m]
+    if m.error is not None:
+        return measurements
+
+    data, m = measure(
+        day, "parse", getattr(module, spec.parser), file_path, trace_memory=trace_memory
+    )
+    measurements.append(m)
+    if m.error is not None:
+        return measurements
+
+    for part in parts or spec.parts:
+        solve = partial(getattr(module, part), **(options or {}))
+        answer, m = measure(day, part, solve, data, trace_memory=trace_memory)
+        m.answer = None if answer is None else str(answer)
+        measurements.append(m)
+
+    return measurements
+
+
+def run_day_fresh(
+    day: int,
+    file_path: str,
+    trace_memory: bool = True,
+    options: Optional[dict[str, int]] = None,
+) -> list[Measurement]:
+    """
+    run_day in a fresh interpreter, so that no imported module or memo table
+    (@cache, lru_cache) is left warm by an earlier trial.
+    """
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        return executor.submit(run_day, day, file_path, trace_memory, options).result()
+
+
+def load_estimates(report_path: str) -> dict[tuple[int, str], float]:
+    """
+    Read a previous JSON report and return the wall time of each (day, part)
+    including its parse, used to schedule the longest jobs first.
+    """
+    with open(report_path, "r") as file:
+        report = json.load(file)
+    parse = {m["day"]: m["wall"] for m in report if m["phase"] == "parse"}
+    return {
+        (m["day"], m["phase"]): m["wall"] + parse.get(m["day"], 0.0)
+        for m in report
+        if m["phase"].startswith("part")
+    }
+
+
+def run_parallel(
+    jobs: list[tuple[int, str, str]],
+    workers: Optional[int],
+    trace_memory: bool,
+    options: dict[int, dict[str, int]],
+    estimates: dict[tuple[int, str], float],
+) -> tuple[list[Measurement], float]:
+    """
+    Run each (day, part, file_path) job in its own worker process, submitting
+    the longest estimated jobs first; jobs without an estimate go after them,
+    latest day and part first, since the later puzzles are the slow ones.
+    Every job imports and parses its day
+    itself in a fresh process, so parts of the same day run independently
+    and no memo table carries over from another job. Returns the
+    measurements in (day, part) order and the elapsed wall time.
+    """
+    ordered = sorted(
+        jobs, key=lambda job: (estimates.get(job[:2], 0.0), job[:2]), reverse=True
+    )
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as executor:
+        futures = {
+            (day, part): executor.submit(
+                run_day, day, file_path, trace_memory, options.get(day), (part,)
+            )
+            for day, part, file_path in ordered
+        }
+        results = {job: future.result() for job, future in futures.items()}
+    elapsed = time.perf_counter() - start
+
+    measurements = []
+    for day, part, _ in jobs:
+        measurements.extend(results[(day, part)])
+    return measurements, elapsed
+
+
+def serial_cpu(measurements: list[Measurement]) -> float:
+    """
+    The CPU time a serial run would have needed for these parallel
+    measurements: every job imports and parses its day itself, so each
+    day's import and parse count once (the cheapest), and the parts in full.
+    """
+    shared: dict[tuple[int, str], float] = {}
+    parts = 0.0
+    for m in measurements:
+        if m.phase in ("import", "parse"):
+            key = (m.day, m.phase)
+            shared[key] = min(shared.get(key, m.cpu), m.cpu)
+        else:
+            parts += m.cpu
+    return parts + sum(shared.values())
+
+
+def import_times(module: str) -> list[tuple[int, int, str]]:
+    """
+    Import module in a fresh interpreter under -X importtime and return
+    (self us, cumulative us, name) for every module it loaded, slowest
+    cumulative first.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [f.strip() for f in line[len("import time:") :].split("|")]
+        if len(fields) == 3 and fields[0].isdigit():
+            times.append((int(fields[0]), int(fields[1]), fields[2].strip()))
+    return sorted(times, key=lambda t: t[1], reverse=True)
+
+
+def format_import_times(days: Sequence[int], top: int = 5) -> str:
+    """Render each day's cold import time and its slowest imports."""
+    lines = [f"{'day':>3}  {'cumulative (ms)':>15}  {'self (ms)':>9}  module"]
+    for day in days:
+        for self_us, cumulative_us, name in import_times(DAYS[day].module)[:top]:
+            lines.append(
+                f"{day:>3}  {cumulative_us / 1000:>15.1f}  {self_us / 1000:>9.1f}  {name}"
+            )
+    return "\n".join(lines)
+
+
+def median_measurements(measurements: list[Measurement]) -> list[Measurement]:
+    """
+    Collapse repeated trials into one measurement per (day, phase) holding
+    the median wall time, CPU time and memory, in first seen order. Imports
+    are left out (unless they failed): they only measure module loading.
+    """
+    groups: dict[tuple[int, str], list[Measurement]] = {}
+    for m in measurements:
+        if m.phase == "import" and m.error is None:
+            continue
+        groups.setdefault((m.day, m.phase), []).append(m)
+
+    def median(values: list[Optional[int]]) -> Optional[int]:
+        known = [v for v in values if v is not None]
+        return int(statistics.median(known)) if known else None
+
+    return [
+        Measurement(
+            day,
+            phase,
+            statistics.median(m.wall for m in group),
+            statistics.median(m.cpu for m in group),
+            median([m.peak_memory for m in group]),
+            answer=group[-1].answer,
+            error=next((m.error for m in group if m.error is not None), None),
+            max_rss=median([m.max_rss for m in group]),
+        )
+        for (day, phase), group in groups.items()
+    ]
+
+
+def to_history(
+    measurements: list[Measurement], revision: str, label: str
+) -> list[history.HistoryRecord]:
+    timestamp = time.time()
+    return [
+        history.HistoryRecord(
+            revision=revision,
+            timestamp=timestamp,
+            label=label,
+            trial=m.trial,
+            day=m.day,
+            phase=m.phase,
+            wall=m.wall,
+            cpu=m.cpu,
+            peak_memory=m.peak_memory,
+            max_rss=m.max_rss,
+            error=m.error,
+        )
+        for m in measurements
+    ]
+
+
+def format_table(measurements: list[Measurement]) -> str:
+    """Render the measurements as a fixed width table."""
+    lines = [
+        f"{'day':>3}  {'phase':<6}  {'wall (s)':>10}  {'cpu (s)':>10}  "
+        f"{'peak (KiB)':>10}  {'rss (MiB)':>9}  answer"
+    ]
+    for m in measurements:
+        peak = "-" if m.peak_memory is None else f"{m.peak_memory / 1024:.1f}"
+        rss = "-" if m.max_rss is None else f"{m.max_rss / 2**20:.1f}"
+        answer = m.error if m.error is not None else (m.answer or "")
+        lines.append(
+            f"{m.day:>3}  {m.phase:<6}  {m.wall:>10.4f}  {m.cpu:>10.4f}  "
+            f"{peak:>10}  {rss:>9}  {answer}"
+        )
+    total_wall = sum(m.wall for m in measurements)
+    total_cpu = sum(m.cpu for m in measurements)
+    lines.append(f"{'':>3}  {'total':<6}  {total_wall:>10.4f}  {total_cpu:>10.4f}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--inputs", "-i", help="directory of dayNN.txt inputs", default="inputs", type=str
+    )
+    parser.add_argument(
+        "--days", "-d", help="days to run (default all)", nargs="*", type=int
+    )
+    parser.add_argument("--json", "-j", help="write a JSON report here", type=str)
+    parser.add_argument(
+        "--no-memory",
+        help="skip tracemalloc peak memory capture (it slows the solutions)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="parse the text even when a cached parse of the input exists",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--import-times",
+        help="also report each day's cold import time from -X importtime",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--jobs",
+        help="run days and parts in parallel on this many processes (0 = all cores)",
+        type=int,
+    )
+    parser.add_argument(
+        "--estimates",
+        help="previous JSON report used to start the longest jobs first",
+        type=str,
+    )
+    parser.add_argument(
+        "--repeat",
+        "-r",
+        help="run everything this many times and report the medians",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--history",
+        help="append every trial to this JSON lines file for history.py compare",
+        type=str,
+    )
+    parser.add_argument(
+        "--label",
+        help="name of the input set in the history (default the inputs directory)",
+        type=str,
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Run each day's parser and parts with wall time, CPU time and peak memory
+    capture, e.g. python runner.py -i inputs -d 1 2 3 -j report.json
+    """
+    args = parse_args(argv)
+    if args.no_cache:
+        os.environ["AOC_PARSE_CACHE"] = "0"
+    days = args.days or sorted(DAYS)
+    options = load_options(args.inputs)
+
+    files = {}
+    for day in days:
+        file_path = input_path(args.inputs, day)
+        if not os.path.exists(file_path):
+            print(f"Skipping day {day}: {file_path} not found", file=sys.stderr)
+            continue
+        files[day] = file_path
+
+    # Repeated trials each run a day in a fresh interpreter; in this one the
+    # second trial would find the modules imported and the memo tables full.
+    run = run_day_fresh if args.repeat > 1 else run_day
+    measurements: list[Measurement] = []
+    for trial in range(args.repeat):
+        if args.jobs is None:
+            trial_measurements = []
+            for day, file_path in files.items():
+                trial_measurements.extend(
+                    run(day, file_path, not args.no_memory, options.get(day))
+                )
+        else:
+            jobs = [
+                (day, part, file_path)
+                for day, file_path in files.items()
+                for part in DAYS[day].parts
+            ]
+            estimates = load_estimates(args.estimates) if args.estimates else {}
+            trial_measurements, elapsed = run_parallel(
+                jobs, args.jobs or None, not args.no_memory, options, estimates
+            )
+        for m in trial_measurements:
+            m.trial = trial
+        measurements.extend(trial_measurements)
+
+    if args.repeat > 1:
+        print(f"Medians of {args.repeat} trials")
+        print(format_table(median_measurements(measurements)))
+    else:
+        print(format_table(measurements))
+    if args.jobs is not None:
+        # Wall times overlap (and stretch) when workers share cores, so the
+        # serial estimate is the CPU time the jobs needed, less the imports
+        # and parses repeated by every part of a day.
+        serial = serial_cpu(trial_measurements)
+        print(
+            f"Elapsed {elapsed:.4f}s on {args.jobs or os.cpu_count()} processes, "
+            f"{serial / elapsed:.2f}x speedup over {serial:.4f}s serial CPU time\n"
+            "(each part job imports and parses its day again: elapsed includes "
+            "that, the serial time counts it once per day)"
+        )
+
+    if args.history:
+        label = args.label or os.path.basename(os.path.normpath(args.inputs))
+        revision = history.git_revision()
+        timed = [m for m in measurements if m.phase != "import" or m.error]
+        history.append(args.history, to_history(timed, revision, label))
+        print(f"Appended {len(timed)} measurements of {revision} to {args.history}")
+
+    if args.import_times:
+        print(format_import_times(list(files)))
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump([asdict(m) for m in measurements], file, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])